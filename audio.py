@@ -1,60 +1,199 @@
+import re
+import time
+import threading
 import pyaudio
-import wave as wf
-import os
-from faster_whisper import WhisperModel
-
-def record_chunk(p, stream, file_path, chunk_length=1):
-    frames = []
-    for _ in range(0, int(16000 / 1024 * chunk_length)):
-        data = stream.read(1024)
-        frames.append(data)
-    wf_file = wf.open(file_path, 'wb')
-    wf_file.setnchannels(1)
-    wf_file.setsampwidth(p.get_sample_size(pyaudio.paInt16))
-    wf_file.setframerate(16000)
-    wf_file.writeframes(b''.join(frames))
-    wf_file.close()
-
-def transcribe_chunk(model, file_path):
-    segments, info = model.transcribe(file_path, beam_size=1)
-    return " ".join([seg.text.strip() for seg in segments])
+from isl_asr import asr_config, get_asr_model
+from isl_audio import WHISPER_RATE, RingBuffer, pcm16_to_float32
+from isl_vad import Segmenter
+
+# --- STREAMING CONFIGURATION ---
+FRAMES_PER_BUFFER = 1024
+STEP_SECONDS = 0.5         # re-transcribe every STEP of new audio
+MAX_WINDOW_SECONDS = 15.0  # uncommitted audio beyond this is force-committed
+BUFFER_SECONDS = 60.0      # ring buffer size; must exceed MAX_WINDOW_SECONDS
+PROMPT_CHARS = 200         # committed text fed back as initial_prompt
+
+
+def _norm(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class LocalAgreement:
+    """
+    LocalAgreement-2: a word is committed once two consecutive hypotheses
+    over the same uncommitted audio agree on it (longest common prefix).
+    """
+
+    def __init__(self):
+        self.prev = []
+
+    def update(self, words):
+        """`words`: [(start_s, end_s, text)] after the commit point. Returns newly committed words."""
+        n = 0
+        for a, b in zip(self.prev, words):
+            if _norm(a[2]) != _norm(b[2]):
+                break
+            n += 1
+        self.prev = words[n:]
+        return words[:n]
+
+    def flush(self):
+        words, self.prev = self.prev, []
+        return words
+
+
+def capture_thread(stream, ring, stop, segmenter=None):
+    """Move microphone audio into `ring` (and the VAD) until `stop` is set; never waits on inference."""
+    while not stop.is_set():
+        data = stream.read(FRAMES_PER_BUFFER, exception_on_overflow=False)
+        samples = pcm16_to_float32(data)
+        ring.write(samples)
+        if segmenter is not None:
+            segmenter.feed(samples)
+
+
+class StreamingTranscriber:
+    """
+    Sliding-window streaming ASR over a RingBuffer.
+
+    Each step transcribes everything from the commit point to "now", so
+    consecutive windows overlap on the uncommitted tail and words are never
+    cut at a chunk boundary. Only words confirmed by LocalAgreement are
+    emitted; the commit point then moves to the end of the last committed word.
+
+    With a VAD `segmenter` (fed by the capture thread), windows without speech
+    are never sent to Whisper, and a closed utterance is committed in full at
+    once instead of waiting for two agreeing hypotheses.
+    """
+
+    def __init__(self, model, ring, on_text=print, step=STEP_SECONDS, max_window=MAX_WINDOW_SECONDS,
+                 segmenter=None):
+        self.model = model
+        self.ring = ring
+        self.segmenter = segmenter
+        self.on_text = on_text
+        self.step = step
+        self.max_window = max_window
+        self.agreement = LocalAgreement()
+        self.committed = 0  # absolute sample index of the commit point
+        self.text = []
+        self.latencies = []
+        self.inference_s = []
+        self.dropped = 0
+        self.skipped = 0  # samples VAD kept away from Whisper
+
+    def hypothesis(self, samples, offset_s):
+        prompt = " ".join(self.text)[-PROMPT_CHARS:] or None
+        t0 = time.perf_counter()
+        segments, info = self.model.transcribe(samples, beam_size=1, word_timestamps=True,
+                                               condition_on_previous_text=False, initial_prompt=prompt)
+        words = [(offset_s + w.start, offset_s + w.end, w.word.strip())
+                 for seg in segments for w in (seg.words or []) if w.word.strip()]
+        self.inference_s.append(time.perf_counter() - t0)
+        return words
+
+    def emit(self, words):
+        if not words:
+            return
+        rate = self.ring.rate
+        now_s = self.ring.total / rate
+        self.latencies.extend(now_s - end for _, end, _ in words)
+        self.committed = max(self.committed, int(words[-1][1] * rate))
+        text = " ".join(w for _, _, w in words)
+        self.text.append(text)
+        self.on_text(text)
+
+    def process(self):
+        """One step: transcribe the uncommitted window and commit what is stable."""
+        rate = self.ring.rate
+        end = self.ring.total
+        if self.committed < self.ring.oldest:
+            # inference fell behind the ring buffer; report it and move on
+            self.dropped += self.ring.oldest - self.committed
+            self.committed = self.ring.oldest
+            self.agreement.flush()
+        vad = self.segmenter
+        if vad is not None:
+            if vad.speech_end <= self.committed:
+                # nothing said since the commit point: skip Whisper, keep a short tail
+                tail = max(self.committed, end - rate // 2)
+                self.skipped += tail - self.committed
+                self.committed = tail
+                return
+            if not vad.triggered:
+                # utterance closed: transcribe it once more and commit all of it
+                samples = self.ring.read(self.committed, end)
+                self.agreement.flush()
+                self.emit(self.hypothesis(samples, self.committed / rate))
+                self.committed = max(self.committed, end)
+                return
+        samples = self.ring.read(self.committed, end)
+        if len(samples) == 0:
+            return
+        words = self.hypothesis(samples, self.committed / rate)
+        window_s = len(samples) / rate
+        if not words:
+            if window_s > 1.0:
+                # silence: keep a short tail so a starting word is not clipped
+                self.committed = end - rate // 2
+                self.agreement.flush()
+            return
+        self.emit(self.agreement.update(words))
+        if (end - self.committed) / rate > self.max_window:
+            # never settles (noise, one long run-on): commit all but the last word
+            rest = self.agreement.flush()
+            self.emit(rest[:-1] if len(rest) > 1 else rest)
+
+    def run(self, stop):
+        next_at = self.ring.total + int(self.step * self.ring.rate)
+        while not stop.is_set():
+            if self.ring.total < next_at:
+                time.sleep(0.01)
+                continue
+            next_at = self.ring.total + int(self.step * self.ring.rate)
+            self.process()
+        self.emit(self.agreement.flush())
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        return {
+            "steps": len(self.inference_s),
+            "mean_inference_s": sum(self.inference_s) / len(self.inference_s) if self.inference_s else 0.0,
+            "median_commit_latency_s": float(lat[len(lat) // 2]) if lat else None,
+            "dropped_s": self.dropped / self.ring.rate,
+            "skipped_silence_s": self.skipped / self.ring.rate,
+        }
+
 
 def main():
-    # model_size must be a string (not a tuple). Default to CPU to avoid CUDA DLL issues.
-    model_size = "medium.en"
-    device = "cuda"  # change to "cuda" if your GPU and CUDA runtimes match
-    # compute_type used only for GPU; keep None for CPU
-    compute_type = None
-    
-    if device == "cpu":
-        model = WhisperModel(model_size, device="cpu")
-        print("Using CPU for transcription.")
-    else:
-        # set a valid compute_type for GPU when needed, e.g. "int8", "float16", or "int8_float16"
-        
-        compute_type = compute_type or "int8"
-        model = WhisperModel(model_size, device="cuda", compute_type=compute_type)
-        print(f"Using GPU for transcription with compute_type={compute_type}.")
+    # device, model size and compute_type from ISL_ASR_* (auto: GPU if CTranslate2 sees one, else int8 CPU)
+    cfg = asr_config("faster-whisper")
+    model = get_asr_model("faster-whisper")
+    print(f"Using {cfg['device'].upper()} for transcription: {cfg['model']}, compute_type={cfg['compute_type']}.")
 
     p = pyaudio.PyAudio()
-    stream = p.open(format=pyaudio.paInt16, channels=1, rate=16000, input=True, frames_per_buffer=1024)
+    stream = p.open(format=pyaudio.paInt16, channels=1, rate=WHISPER_RATE, input=True,
+                    frames_per_buffer=FRAMES_PER_BUFFER)
 
-    accumulated_transcription = ""
+    ring = RingBuffer(BUFFER_SECONDS, WHISPER_RATE)
+    segmenter = Segmenter(collect=False)  # backend from ISL_VAD
+    stop = threading.Event()
+    transcriber = StreamingTranscriber(model, ring, segmenter=segmenter)
+    capture = threading.Thread(target=capture_thread, args=(stream, ring, stop, segmenter), daemon=True)
+    capture.start()
     try:
-        while True:
-            chunk_file = "temp_chunk.wav"
-            record_chunk(p, stream, chunk_file)
-            transcription = transcribe_chunk(model, chunk_file)
-            print(transcription)
-            accumulated_transcription += (transcription + " ")
-            if os.path.exists(chunk_file):
-                os.remove(chunk_file)
+        transcriber.run(stop)
     except KeyboardInterrupt:
         print("Stopping...")
+        stop.set()
+        transcriber.emit(transcriber.agreement.flush())
         with open("log.txt", "w", encoding="utf-8") as log_file:
-            log_file.write(accumulated_transcription.strip())
+            log_file.write(" ".join(transcriber.text))
     finally:
-        print("LOG:", accumulated_transcription.strip())
+        stop.set()
+        capture.join(timeout=1.0)
+        print("LOG:", " ".join(transcriber.text))
+        print("STATS:", transcriber.stats(), segmenter.stats())
         stream.stop_stream()
         stream.close()
         p.terminate()
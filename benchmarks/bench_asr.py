@@ -0,0 +1,89 @@
+# bench_asr.py
+"""
+CPU real-time factor of the ASR backends in isl_asr, per model size and
+compute type. RTF = transcription time / audio duration (< 1 is faster than
+real time). Models load through isl_asr, so ISL_ASR_CPU_THREADS and
+ISL_ASR_NUM_WORKERS apply.
+
+isl_speech/help.wav is digital silence, which only measures the fixed
+encoder + decoder cost; pass --wav with real speech for decoding-heavy numbers.
+
+Usage: python benchmarks/bench_asr.py [--backend faster-whisper]
+           [--sizes tiny.en base.en small.en] [--compute-types int8 int8_float32]
+           [--wav isl_speech/help.wav] [--repeat 3]
+"""
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from isl_asr import ASR_BACKENDS, asr_config, get_asr_model
+from isl_audio import WHISPER_RATE, pyaudio_frames_to_array
+
+
+def load_wav(path):
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM")
+        raw = w.readframes(w.getnframes())
+        return pyaudio_frames_to_array([raw], w.getframerate(), w.getnchannels())
+
+
+def transcribe(backend, model, samples):
+    if backend == "faster-whisper":
+        segments, info = model.transcribe(samples, beam_size=1)
+        return " ".join(seg.text.strip() for seg in segments)  # segments are lazy
+    return model.transcribe(samples, fp16=False)["text"].strip()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="ASR real-time factor on CPU")
+    ap.add_argument("--backend", default="faster-whisper", choices=sorted(ASR_BACKENDS))
+    ap.add_argument("--sizes", nargs="+", default=["tiny.en", "base.en", "small.en"])
+    ap.add_argument("--compute-types", nargs="+", default=["int8", "int8_float32"],
+                    help="faster-whisper only")
+    ap.add_argument("--wav", default=os.path.join(ROOT, "isl_speech", "help.wav"))
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    samples = load_wav(args.wav)
+    duration = len(samples) / WHISPER_RATE
+    compute_types = args.compute_types if args.backend == "faster-whisper" else [None]
+
+    runs = []
+    for size in args.sizes:
+        for compute_type in compute_types:
+            cfg = asr_config(args.backend, model=size, device="cpu", compute_type=compute_type)
+            t0 = time.perf_counter()
+            model = get_asr_model(args.backend, model=size, device="cpu", compute_type=compute_type)
+            load_s = time.perf_counter() - t0
+            text = transcribe(args.backend, model, samples)  # warm-up
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                transcribe(args.backend, model, samples)
+                best = min(best, time.perf_counter() - t0)
+            runs.append({
+                "model": size,
+                "compute_type": cfg["compute_type"],
+                "load_s": round(load_s, 2),
+                "transcribe_s": round(best, 3),
+                "rtf": round(best / duration, 3),
+                "text": text,
+            })
+            print(json.dumps(runs[-1]), file=sys.stderr)
+
+    print(json.dumps({
+        "backend": args.backend,
+        "wav": os.path.relpath(args.wav, ROOT),
+        "audio_s": round(duration, 2),
+        "peak": round(float(np.abs(samples).max()) if len(samples) else 0.0, 4),
+        "cpu_threads": asr_config(args.backend, device="cpu")["cpu_threads"],
+        "runs": runs,
+    }, indent=2))
@@ -0,0 +1,80 @@
+# bench_gloss.py
+"""
+Per-utterance cost of the isl_speech gloss engine.
+
+"before" is the old per-script setup: the full en_core_web_sm pipeline and
+one nlp() call per utterance. Each gloss profile is then measured per call
+(GlossEngine.gloss) and streamed (GlossEngine.gloss_stream over nlp.pipe).
+CPU time is this process only; with --processes the pipe run also reports
+wall time for the multi-process backlog path (worker CPU is not counted).
+Every row also keeps tokens_per_sec (spaCy tokens over the best wall time).
+
+Usage: python benchmarks/bench_gloss.py [--repeat 5] [--copies 10] [--processes 2]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "isl_speech"))
+
+from gloss_engine import GlossEngine, GLOSS_PROFILES, BATCH_SIZE
+
+UTTERANCES = [
+    "Hello, how are you today?",
+    "I do not want to go to the hospital.",
+    "Where did you buy that car?",
+    "My mother is cooking dinner at home.",
+    "Can you help me find the station?",
+    "We will purchase a new house next year.",
+    "The children are playing outside.",
+    "Why are you late again?",
+    "Thank you for coming to the meeting.",
+    "I never eat meat on Tuesdays.",
+]
+
+
+def measure(fn, texts, repeat, n_tokens):
+    """Best-of-`repeat` (cpu_ms, wall_ms) per utterance, and tokens_per_sec."""
+    best_cpu = best_wall = float("inf")
+    for _ in range(repeat):
+        c0, w0 = time.process_time(), time.perf_counter()
+        fn(texts)
+        best_cpu = min(best_cpu, time.process_time() - c0)
+        best_wall = min(best_wall, time.perf_counter() - w0)
+    n = len(texts)
+    return {"cpu_ms": round(best_cpu * 1000.0 / n, 3), "wall_ms": round(best_wall * 1000.0 / n, 3),
+            "tokens_per_sec": round(n_tokens / best_wall) if best_wall else None}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="gloss engine per-utterance cost")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--copies", type=int, default=10, help="corpus = built-in utterances x copies")
+    ap.add_argument("--processes", type=int, default=0, help="also time nlp.pipe with n_process")
+    args = ap.parse_args()
+
+    texts = UTTERANCES * args.copies
+    results = {}
+    n_tokens = None
+    for profile in GLOSS_PROFILES:
+        engine = GlossEngine(profile=profile)
+        engine.gloss_many(texts[:BATCH_SIZE])  # warm up
+        if n_tokens is None:
+            n_tokens = sum(len(doc) for doc in engine.nlp.pipe(texts))  # same tokenizer in every profile
+        row = {"components": engine.nlp.pipe_names}
+        row["per_call"] = measure(lambda ts: [engine.gloss(t) for t in ts], texts, args.repeat, n_tokens)
+        row["pipe"] = measure(lambda ts: list(engine.gloss_stream(ts)), texts, args.repeat, n_tokens)
+        if args.processes > 1:
+            row["pipe_n_process"] = measure(
+                lambda ts: list(engine.gloss_stream(ts, n_process=args.processes)), texts, 1, n_tokens)
+        results[profile] = row
+
+    # before: full pipeline, one nlp() per utterance; after: gloss profile, nlp.pipe
+    before = results["full"]["per_call"]["cpu_ms"]
+    after = results["gloss"]["pipe"]["cpu_ms"]
+    results["utterances"] = len(texts)
+    results["tokens"] = n_tokens
+    results["cpu_speedup_gloss_pipe"] = round(before / after, 2) if after else None
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,373 @@
+# bench_pipeline.py
+"""
+Per-stage benchmark of the isl_tokenizer pipeline on a fixed corpus
+(benchmarks/pipeline_corpus.json: captions, paragraphs, long documents).
+
+Stages, each timed on its own over inputs prepared by one untimed pass:
+  tokenize               stanza (tokenize_docs) + sentence / word lists
+  standin_parse          StandInParser.parse_sents (below)
+  reorder_eng_to_isl     reorder_indices_batch, reorder_cache cleared per run
+  modify_tree_structure  on the stand-in trees
+  remove_punct, filter_words, lemmatize   on the words in ISL order (apply_orders)
+  final_output           words.txt mapping + letter fallback
+  end_to_end             text_to_isl per item (stand-in parser, cold reorder_cache)
+
+The Stanford parser is replaced by StandInParser, a deterministic tagger +
+chunker that emits Stanford-style bracketed trees, so the suite runs offline
+without Java and the reorder numbers are this repo's code only. Stanza models
+are still needed: its tokens, POS tags and lemmas feed every later stage.
+
+Numbers are the best of --repeat runs (after one discarded warm-up run), in
+ms per corpus item, plus the same value divided by a fixed pure-Python
+calibration loop ("norm"), so a baseline recorded on another machine stays
+comparable. A stage is a regression if its norm is more than --tolerance
+above the baseline and it is also --min-ms slower in absolute terms. The
+tokens of every set are fingerprinted, and changed output fails too.
+No baseline is shipped (it has to come from the real stanza models), so the
+first run on a machine records one, as --update-baseline would, and says so;
+every later run is gated against it. Keep the file (commit it, or cache
+benchmarks/baselines/ in CI). --require-baseline turns a missing baseline
+into an error instead, for jobs where it should already be there.
+
+Usage: python benchmarks/bench_pipeline.py [--repeat 5] [--sets captions paragraphs documents]
+           [--baseline benchmarks/baselines/pipeline.json] [--update-baseline]
+           [--require-baseline] [--tolerance 0.25] [--min-ms 0.05]
+Exits 1 on a regression or changed output, 2 if the corpus no longer matches
+the baseline (or, with --require-baseline, if there is none).
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import platform
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, ROOT)
+
+import isl_tokenizer
+from isl_tokenizer import (tokenize_docs, convert_to_sentence_list, convert_to_word_list,
+                           reorder_indices_batch, apply_orders, reorder_cache, modify_tree_structure,
+                           remove_punct, filter_words, lemmatize, final_output, text_to_isl)
+
+CORPUS = os.path.join(ROOT, "benchmarks", "pipeline_corpus.json")
+BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "pipeline.json")
+WORDS_FILE = os.path.join(ROOT, "words.txt")
+SETS = ("captions", "paragraphs", "documents")
+
+
+# ---------------- deterministic stand-in for the Stanford parser ----------------
+LEXICON = {}
+for _tag, _words in {
+    "DT": "the a an this that these those every some any each no all",
+    "PRP": "i you he she it we they me him her us them",
+    "PRP$": "my your his its our their",
+    "IN": "in on at of for with from by about after before under over near into through until "
+          "since because if than as like between during without",
+    "TO": "to",
+    "CC": "and or but",
+    "MD": "will would can could shall should may might must ca wo",
+    "RB": "not n't never very too also again always still only here there just now soon",
+    "WP": "what who whom which",
+    "WRB": "where when why how",
+    "VBZ": "is has does",
+    "VBP": "are am have do",
+    "VBD": "was were had did",
+    "VB": "be go come like love want need help take give make see hear read write eat drink sit "
+          "walk talk ask tell send buy keep bring stop open close visit meet play learn turn touch "
+          "leave live grow cook listen show wait use find know think carry move join become begin "
+          "run fill share protect test build work plan decide measure clean check call",
+}.items():
+    for _w in _words.split():
+        LEXICON[_w] = _tag
+
+NOMINAL = {"DT", "PRP$", "JJ", "CD", "NN", "NNS", "NNP", "PRP", "POS"}
+VERBAL = {"MD", "RB", "VB", "VBZ", "VBP", "VBD", "VBG", "VBN"}
+PUNCT = {".", ","}
+
+
+def standin_tag(word: str) -> str:
+    w = word.lower()
+    if w in LEXICON:
+        return LEXICON[w]
+    if not any(ch.isalnum() for ch in w):
+        return "." if w in (".", "?", "!") else ","
+    if w == "'s":
+        return "POS"
+    if w[0].isdigit():
+        return "CD"
+    if w.endswith("ing") and len(w) > 4:
+        return "VBG"
+    if w.endswith("ed") and len(w) > 3:
+        return "VBD"
+    if w.endswith("ly") and len(w) > 3:
+        return "RB"
+    if w.endswith("s") and not w.endswith("ss") and len(w) > 3:
+        return "NNS"
+    return "NN"
+
+
+def _leaf(word: str, tag: str) -> str:
+    word = {"(": "-LRB-", ")": "-RRB-"}.get(word, word)
+    return f"({tag} {word})"
+
+
+class StandInParser:
+    """
+    Offline replacement for the Stanford parser pool: tags words from a small
+    lexicon and suffix rules, chunks NP / PP / verb groups and nests each verb
+    group's right context in a VP. Deterministic; not a real parser.
+    """
+
+    def parse_sents(self, sentences):
+        return [self.parse(words) for words in sentences]
+
+    def parse(self, words) -> str:
+        tagged = [(w, standin_tag(w)) for w in words]
+        chunks, i = [], 0
+        while i < len(tagged):
+            tag = tagged[i][1]
+            if tag in NOMINAL:
+                j = i
+                while j < len(tagged) and tagged[j][1] in NOMINAL:
+                    j += 1
+                chunks.append(("NP", tagged[i:j]))
+            elif tag == "IN" or (tag == "TO" and i + 1 < len(tagged) and tagged[i + 1][1] in NOMINAL):
+                j = i + 1
+                while j < len(tagged) and tagged[j][1] in NOMINAL:
+                    j += 1
+                chunks.append(("PP", tagged[i:j]))
+            elif tag in VERBAL or tag == "TO":
+                j = i
+                while j < len(tagged) and (tagged[j][1] in VERBAL or tagged[j][1] == "TO"):
+                    j += 1
+                chunks.append(("V", tagged[i:j]))
+            else:
+                j = i + 1
+                chunks.append(("X", tagged[i:j]))
+            i = j
+        tail = []
+        while chunks and chunks[-1][0] == "X" and chunks[-1][1][0][1] in PUNCT:
+            tail.insert(0, _leaf(*chunks.pop()[1][0]))
+        first_verb = next((k for k, c in enumerate(chunks) if c[0] == "V"), None)
+        if first_verb is None:
+            body = [self._render(c) for c in chunks]
+            label = "FRAG"
+        else:
+            body = [self._render(c) for c in chunks[:first_verb]] + [self._vp(chunks[first_verb:])]
+            label = "S"
+        return f"(ROOT ({label} {' '.join(body + tail)}))"
+
+    def _render(self, chunk) -> str:
+        kind, tagged = chunk
+        if kind == "PP":
+            head, rest = tagged[0], tagged[1:]
+            inner = _leaf(*head) + (" (NP " + " ".join(_leaf(*t) for t in rest) + ")" if rest else "")
+            return f"(PP {inner})"
+        if kind == "NP":
+            return "(NP " + " ".join(_leaf(*t) for t in tagged) + ")"
+        return " ".join(_leaf(*t) for t in tagged)
+
+    def _vp(self, chunks) -> str:
+        parts = [_leaf(*t) for t in chunks[0][1]]
+        for k, c in enumerate(chunks[1:], 1):
+            if c[0] == "V":
+                parts.append(self._vp(chunks[k:]))
+                break
+            parts.append(self._render(c))
+        return "(VP " + " ".join(parts) + ")"
+
+
+# ---------------- timing ----------------
+def calibrate(repeat: int) -> float:
+    """Best-of ms for a fixed pure-Python loop (dicts, strings, lists) to normalize by machine speed."""
+    best = float("inf")
+    for _ in range(max(5, repeat)):
+        t0 = time.perf_counter()
+        seen = {}
+        out = []
+        for i in range(50000):
+            key = "w%d" % (i % 997)
+            seen[key] = seen.get(key, 0) + 1
+            if i % 3 == 0:
+                out.append(key.upper())
+        out.sort()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def prepare(texts):
+    """One untimed pass: every stage's input, per text."""
+    parser = StandInParser()
+    items = []
+    for text in texts:
+        doc = tokenize_docs([isl_tokenizer.sanitize_text(text)])[0]
+        word_list, word_list_detailed = convert_to_word_list(convert_to_sentence_list(doc)[1])
+        trees = parser.parse_sents(word_list)
+        orders = reorder_indices_batch(word_list)
+        wl, wd = apply_orders(word_list, orders), apply_orders(word_list_detailed, orders)
+        remove_punct(wl, wd)
+        final_words = filter_words(wl, wd)
+        lemmatize(final_words, wd)
+        items.append({"text": text, "word_list": word_list, "detailed": word_list_detailed,
+                      "trees": trees, "orders": orders, "final_words": final_words})
+    return items
+
+
+def time_stages(texts, items, repeat):
+    """{stage: [ms per run]} over the whole set."""
+    from nltk.tree import ParentedTree
+    parser = StandInParser()
+    trees = [ParentedTree.fromstring(t) for item in items for t in item["trees"]]
+    runs = {s: [] for s in ("tokenize", "standin_parse", "reorder_eng_to_isl", "modify_tree_structure",
+                            "remove_punct", "filter_words", "lemmatize", "final_output", "end_to_end")}
+
+    def clock(stage, fn):
+        t0 = time.perf_counter()
+        out = fn()
+        runs[stage].append((time.perf_counter() - t0) * 1000.0)
+        return out
+
+    outputs = None
+    for _ in range(repeat + 1):
+        clock("tokenize", lambda: [convert_to_word_list(convert_to_sentence_list(
+            tokenize_docs([isl_tokenizer.sanitize_text(t)])[0])[1]) for t in texts])
+        clock("standin_parse", lambda: [parser.parse_sents(item["word_list"]) for item in items])
+        reorder_cache.clear()
+        clock("reorder_eng_to_isl", lambda: [reorder_indices_batch(item["word_list"]) for item in items])
+        clock("modify_tree_structure", lambda: [modify_tree_structure(t) for t in trees])
+
+        # these three mutate their inputs: fresh reordered copies per run, made outside the clock
+        state = [(apply_orders(item["word_list"], item["orders"]), apply_orders(item["detailed"], item["orders"]))
+                 for item in items]
+        clock("remove_punct", lambda: [remove_punct(wl, wd) for wl, wd in state])
+        final = clock("filter_words", lambda: [filter_words(wl, wd) for wl, wd in state])
+        clock("lemmatize", lambda: [lemmatize(fw, wd) for fw, (_, wd) in zip(final, state)])
+
+        clock("final_output", lambda: [[final_output(words, WORDS_FILE) for words in item["final_words"]]
+                                       for item in items])
+        reorder_cache.clear()
+        outputs = clock("end_to_end", lambda: [text_to_isl(t, WORDS_FILE, reorder="stanford")[0] for t in texts])
+    return {stage: times[1:] for stage, times in runs.items()}, outputs  # run 0 warms lazy state
+
+
+def fingerprint(obj) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def run(corpus, sets, repeat):
+    # warm up: stanza load, words.txt index, nltk import - not part of any stage
+    t0 = time.perf_counter()
+    isl_tokenizer.get_pipeline()("warm up")
+    load_s = time.perf_counter() - t0
+    calibration_ms = calibrate(repeat)
+
+    results = {}
+    for name in sets:
+        texts = corpus[name]
+        items = prepare(texts)
+        runs, outputs = time_stages(texts, items, repeat)
+        n = len(texts)
+        stages = {}
+        for stage, times in runs.items():
+            ms = min(times) / n
+            stages[stage] = {"ms_per_item": round(ms, 4), "ms_total": round(ms * n, 3),
+                             "norm": round(ms / calibration_ms, 8)}
+        results[name] = {
+            "items": n,
+            "sentences": sum(len(item["word_list"]) for item in items),
+            "words": sum(len(words) for item in items for words in item["word_list"]),
+            "tokens_out": sum(len(tokens) for tokens in outputs),
+            "fingerprint": fingerprint(outputs),
+            "stages": stages,
+        }
+        print(json.dumps({name: {s: v["ms_per_item"] for s, v in stages.items()}}), file=sys.stderr)
+    return {"stanza_load_s": round(load_s, 2), "calibration_ms": round(calibration_ms, 3), "sets": results}
+
+
+def compare(current, baseline, tolerance, min_ms):
+    """Per-stage rows and the failures (regressions + changed output) against `baseline`."""
+    rows, failures = [], []
+    for name, cur in current["sets"].items():
+        base = baseline["sets"].get(name)
+        if base is None:
+            continue
+        if cur["fingerprint"] != base["fingerprint"]:
+            failures.append(f"{name}: token output changed ({base['fingerprint']} -> {cur['fingerprint']})")
+        for stage, c in cur["stages"].items():
+            b = base["stages"].get(stage)
+            if b is None or not b["norm"]:
+                continue
+            ratio = c["norm"] / b["norm"]
+            # baseline cost expressed in this machine's milliseconds
+            expected_ms = b["norm"] * current["calibration_ms"]
+            status = "ok"
+            if ratio > 1 + tolerance and c["ms_per_item"] - expected_ms > min_ms:
+                status = "regression"
+                failures.append(f"{name}/{stage}: {ratio:.2f}x baseline "
+                                f"({c['ms_per_item']:.3f} ms vs {expected_ms:.3f} ms expected)")
+            elif ratio < 1 - tolerance:
+                status = "improved"
+            rows.append({"set": name, "stage": stage, "ratio": round(ratio, 3),
+                         "ms_per_item": c["ms_per_item"], "baseline_ms_scaled": round(expected_ms, 4),
+                         "status": status})
+    return rows, failures
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="isl_tokenizer per-stage benchmark with baseline compare")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--sets", nargs="+", default=list(SETS), choices=SETS)
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true", help="write this run as the new baseline")
+    ap.add_argument("--require-baseline", action="store_true",
+                    help="fail if there is no baseline instead of recording one")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    ap.add_argument("--min-ms", type=float, default=0.05, help="ignore slowdowns smaller than this per item")
+    args = ap.parse_args()
+    first_run = not args.update_baseline and not os.path.exists(args.baseline)
+    if first_run and args.require_baseline:
+        print(f"no baseline at {args.baseline}; record one with --update-baseline", file=sys.stderr)
+        sys.exit(2)
+
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = json.load(f)
+    # the parser is never started: every parse goes to the stand-in
+    standin = StandInParser()
+    isl_tokenizer.get_parser = lambda: standin
+
+    report = {
+        "corpus": {"sha1": fingerprint(corpus), **{s: len(corpus[s]) for s in SETS}},
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+    report.update(run(corpus, args.sets, args.repeat))
+
+    status = 0
+    if args.update_baseline or first_run:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        report["comparison"] = {"baseline_written": os.path.relpath(args.baseline, ROOT)}
+        if first_run:
+            report["comparison"]["reason"] = "no baseline yet; later runs compare against this one"
+            print(f"no baseline at {args.baseline}; recorded this run as the baseline", file=sys.stderr)
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["corpus"]["sha1"] != report["corpus"]["sha1"]:
+            report["comparison"] = {"error": "corpus changed since the baseline; re-record with --update-baseline"}
+            status = 2
+        else:
+            rows, failures = compare(report, baseline, args.tolerance, args.min_ms)
+            report["comparison"] = {"baseline": os.path.relpath(args.baseline, ROOT),
+                                    "tolerance": args.tolerance, "min_ms": args.min_ms,
+                                    "failures": failures, "stages": rows}
+            status = 1 if failures else 0
+
+    print(json.dumps(report, indent=2))
+    sys.exit(status)
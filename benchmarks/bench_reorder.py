@@ -0,0 +1,146 @@
+# bench_reorder.py
+"""
+Equivalence check + benchmark for the parse-tree reordering in isl_tokenizer.
+
+The reference below is the original modify_tree_structure port (repeated
+subtrees() walks, treeposition() lookups, nested subtrees() + leaves()),
+with three fixes: it inserts copies, since nltk refuses to insert a subtree
+that already has a parent; it never takes the root (the original crashed on
+root.parent() there); and a node is skipped when it, any ancestor or any
+descendant was already taken (the original only checked the parent, so the
+words of nested NPs came out twice). The single-pass engine
+(reorder_tree_leaves / modify_tree_structure) must produce the same leaves on
+every tree, and those leaves must be a permutation of the tree's leaves.
+
+Usage: python benchmarks/bench_reorder.py [--trees 2000] [--seed 0] [--lengths 10 40 120]
+Exits 1 if any tree disagrees or loses / repeats a word.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from nltk.tree import Tree, ParentedTree
+from isl_tokenizer import reorder_tree_leaves, modify_tree_structure
+
+# hand-written trees in Stanford parser style
+SAMPLE_TREES = [
+    "(ROOT (S (NP (PRP I)) (VP (VBP love) (NP (NNS dogs)))))",
+    "(ROOT (SQ (VBP are) (NP (PRP you)) (ADJP (JJ ok))))",
+    "(ROOT (S (NP (DT The) (NN boy)) (VP (VBD went) (PP (TO to) (NP (DT the) (NN school)))) (. .)))",
+    "(ROOT (S (NP (NP (DT the) (NN dog)) (PP (IN of) (NP (DT the) (NN town)))) (VP (VBD barked))))",
+    "(ROOT (SBARQ (WHNP (WP What)) (SQ (VBZ is) (NP (PRP$ your) (NN name))) (. ?)))",
+    "(ROOT (S (NP (PRP I)) (VP (MD will) (RB not) (VP (VB go) (ADVP (RB home)) (NP (NN tomorrow))))))",
+    "(ROOT (INTJ (UH hello)))",
+    "(ROOT (NP (NN thanks)))",
+]
+
+PHRASE_LABELS = ["S", "NP", "VP", "PP", "ADJP", "ADVP", "SBAR", "PRP"]
+TAGS = ["NN", "NNS", "VB", "VBD", "JJ", "RB", "IN", "DT", "PRP", "CC"]
+
+
+# ---------------- reference implementation (original port, copy-on-insert) ----------------
+def _ref_modify_tree_structure(parent_tree):
+    taken = []
+    out = ParentedTree('ROOT', [])
+    i = 0
+
+    def free(t):
+        pos = t.treeposition()
+        return not any(pos[:len(p)] == p or p[:len(pos)] == pos for p in taken)
+
+    for sub_tree in parent_tree.subtrees():
+        if sub_tree.label() == "NP":
+            if sub_tree.parent() is not None and free(sub_tree):
+                taken.append(sub_tree.treeposition())
+                out.insert(i, sub_tree.copy(deep=True))
+                i += 1
+        if sub_tree.label() == "VP" or sub_tree.label() == "PRP":
+            for child in sub_tree.subtrees():
+                if child.label() == "NP" or child.label() == "PRP":
+                    if child.parent() is not None and free(child):
+                        taken.append(child.treeposition())
+                        out.insert(i, child.copy(deep=True))
+                        i += 1
+
+    for sub_tree in parent_tree.subtrees():
+        for child in sub_tree.subtrees():
+            if len(child.leaves()) == 1 and child.parent() is not None and free(child):
+                taken.append(child.treeposition())
+                out.insert(i, child.copy(deep=True))
+                i += 1
+    return out
+
+
+# ---------------- random parse-like trees ----------------
+def random_tree(rng, n_leaves, depth=0):
+    if n_leaves == 1 and (depth > 0 and rng.random() < 0.7):
+        return Tree(rng.choice(TAGS), ["w%d" % rng.randrange(1000)])
+    label = rng.choice(PHRASE_LABELS)
+    if n_leaves == 1:
+        return Tree(label, [random_tree(rng, 1, depth + 1)])
+    n_children = rng.randint(1, min(4, n_leaves))
+    if n_children == 1:
+        return Tree(label, [random_tree(rng, n_leaves, depth + 1)])
+    cuts = sorted(rng.sample(range(1, n_leaves), n_children - 1))
+    sizes = [b - a for a, b in zip([0] + cuts, cuts + [n_leaves])]
+    return Tree(label, [random_tree(rng, k, depth + 1) for k in sizes])
+
+
+def random_sentence_tree(rng, n_leaves):
+    return Tree("ROOT", [random_tree(rng, n_leaves, 1)])
+
+
+def check_equivalence(trees):
+    mismatches, not_permutations = [], []
+    for t in trees:
+        pt = ParentedTree.convert(t)
+        expected = _ref_modify_tree_structure(pt).leaves()
+        got = reorder_tree_leaves(t)
+        if got != expected or modify_tree_structure(pt).leaves() != expected:
+            mismatches.append(str(t))
+        if sorted(got) != sorted(t.leaves()):
+            not_permutations.append(str(t))
+    return mismatches, not_permutations
+
+
+def time_it(fn, trees, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for t in trees:
+            fn(t)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(trees) * 1000.0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="modify_tree_structure equivalence + benchmark")
+    ap.add_argument("--trees", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--lengths", type=int, nargs="+", default=[10, 40, 120])
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    trees = [Tree.fromstring(s) for s in SAMPLE_TREES]
+    trees += [random_sentence_tree(rng, rng.randint(1, 30)) for _ in range(args.trees)]
+    mismatches, not_permutations = check_equivalence(trees)
+
+    timings = {}
+    for n in args.lengths:
+        batch = [ParentedTree.convert(random_sentence_tree(rng, n)) for _ in range(20)]
+        ref_ms = time_it(lambda t: _ref_modify_tree_structure(t).leaves(), batch)
+        new_ms = time_it(reorder_tree_leaves, batch)
+        timings[str(n)] = {"reference_ms": round(ref_ms, 3), "single_pass_ms": round(new_ms, 3),
+                           "speedup": round(ref_ms / new_ms, 1) if new_ms else None}
+
+    print(json.dumps({"trees_checked": len(trees), "mismatches": len(mismatches),
+                      "first_mismatch": mismatches[0] if mismatches else None,
+                      "not_permutations": len(not_permutations),
+                      "first_not_permutation": not_permutations[0] if not_permutations else None,
+                      "per_tree_by_leaf_count": timings}, indent=2))
+    sys.exit(1 if mismatches or not_permutations else 0)
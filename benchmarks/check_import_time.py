@@ -0,0 +1,49 @@
+# check_import_time.py
+"""
+Import-time budget check for isl_tokenizer.
+
+`import isl_tokenizer` must not load stanza / nltk models or touch the network;
+those happen lazily in get_pipeline() / warmup(). This script imports the module
+in a fresh interpreter a few times and fails (exit code 1) if the best run is
+over budget.
+
+Usage: python benchmarks/check_import_time.py [--budget-ms 50] [--runs 5]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+SNIPPET = (
+    "import time, sys; t0 = time.perf_counter(); import isl_tokenizer; "
+    "dt = time.perf_counter() - t0; "
+    "heavy = [m for m in ('stanza', 'nltk', 'torch') if m in sys.modules]; "
+    "print(dt * 1000); print(','.join(heavy))"
+)
+
+
+def measure(runs: int):
+    times = []
+    heavy = set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", SNIPPET], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.split("\n")
+        times.append(float(out[0]))
+        heavy.update(m for m in out[1].split(",") if m)
+    return min(times), sorted(heavy)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="isl_tokenizer import-time budget check")
+    ap.add_argument("--budget-ms", type=float, default=50.0)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    best_ms, heavy = measure(args.runs)
+    ok = best_ms <= args.budget_ms and not heavy
+    print(json.dumps({"import_ms": round(best_ms, 2), "budget_ms": args.budget_ms,
+                      "heavy_modules_loaded": heavy, "ok": ok}))
+    sys.exit(0 if ok else 1)
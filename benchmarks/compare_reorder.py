@@ -0,0 +1,108 @@
+# compare_reorder.py
+"""
+Compare the rule-based reorder backend against the Stanford parser backend.
+
+Both run on the same stanza tokenization of a small caption-style corpus.
+The agreement figures compare the final tokens of texts_to_isl (after stop
+words, lemmas and letter fallback), not the raw reordered words: exact-match
+rate and mean pairwise order agreement (share of token pairs that both
+backends put in the same relative order). Latency is the reorder step alone,
+per sentence. Needs stanza models and Java + the Stanford jars.
+
+Usage: python benchmarks/compare_reorder.py [--file sentences.txt] [--show]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import isl_tokenizer
+from isl_tokenizer import (get_pipeline, convert_to_sentence_list, convert_to_word_list,
+                           reorder_indices_batch, reorder_indices_by_rules, reorder_cache, texts_to_isl)
+
+WORDS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "words.txt")
+
+SENTENCES = [
+    "Are you ok?",
+    "Thank you very much.",
+    "I am going to school tomorrow.",
+    "She does not like apples.",
+    "Where is the train station?",
+    "My brother bought a new car yesterday.",
+    "What is your name?",
+    "We will meet at the library after lunch.",
+    "The doctor gave the child some medicine.",
+    "Please help me carry these books.",
+    "I never drink coffee at night.",
+    "How old is your sister?",
+    "They are playing football in the park.",
+    "Can you send me the letter today?",
+    "The old man walked slowly to the market.",
+]
+
+
+def pair_agreement(a, b):
+    """Share of word pairs (present once in both) ordered the same way by a and b."""
+    common = [w for w in a if a.count(w) == 1 and b.count(w) == 1]
+    pairs = list(combinations(common, 2))
+    if not pairs:
+        return 1.0
+    pos_a = {w: i for i, w in enumerate(a)}
+    pos_b = {w: i for i, w in enumerate(b)}
+    same = sum(1 for x, y in pairs if (pos_a[x] < pos_a[y]) == (pos_b[x] < pos_b[y]))
+    return same / len(pairs)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="rules vs stanford reorder comparison")
+    ap.add_argument("--file", help="one sentence per line (default: built-in corpus)")
+    ap.add_argument("--show", action="store_true", help="print both orders for every sentence")
+    args = ap.parse_args()
+
+    sentences = SENTENCES
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            sentences = [ln.strip() for ln in f if ln.strip()]
+
+    nlp = get_pipeline()
+    word_lists, detailed = [], []
+    for text in sentences:
+        _, sents = convert_to_sentence_list(nlp(text))
+        wl, wld = convert_to_word_list(sents)
+        word_lists.extend(wl)
+        detailed.extend(wld)
+
+    # start the JVM outside the timed region
+    isl_tokenizer.warmup()
+    reorder_cache.clear()
+
+    t0 = time.perf_counter()
+    reorder_indices_batch(word_lists)
+    stanford_ms = (time.perf_counter() - t0) * 1000.0 / len(word_lists)
+
+    t0 = time.perf_counter()
+    for words in detailed:
+        reorder_indices_by_rules(words)
+    rules_ms = (time.perf_counter() - t0) * 1000.0 / len(word_lists)
+
+    stanford = [tokens for tokens, _, _ in texts_to_isl(sentences, WORDS_FILE, reorder="stanford")]
+    rules = [tokens for tokens, _, _ in texts_to_isl(sentences, WORDS_FILE, reorder="rules")]
+
+    exact = sum(1 for a, b in zip(stanford, rules) if a == b)
+    agreement = [pair_agreement(a, b) for a, b in zip(stanford, rules)]
+    if args.show:
+        for text, a, b in zip(sentences, stanford, rules):
+            print(text, "\n  stanford:", " ".join(a), "\n  rules:   ", " ".join(b))
+
+    print(json.dumps({
+        "texts": len(sentences),
+        "sentences": len(word_lists),
+        "exact_match_rate": round(exact / len(sentences), 3),
+        "mean_pair_agreement": round(sum(agreement) / len(agreement), 3),
+        "stanford_ms_per_sentence": round(stanford_ms, 3),
+        "rules_ms_per_sentence": round(rules_ms, 3),
+    }, indent=2))
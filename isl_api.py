@@ -1,17 +1,43 @@
 # isl_api.py
 import os
-from fastapi import FastAPI, HTTPException
+import json
+import asyncio
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List
-from isl_tokenizer import text_to_isl
+from functools import partial
+from typing import List, Optional
+from urllib.parse import quote
+from concurrent.futures.process import BrokenProcessPool
+from isl_workers import TokenizerPool, PoolOverloaded, translate_chunk, worker_health
+from isl_batcher import MicroBatcher
+from isl_tokenizer import REORDER_BACKENDS, DEFAULT_REORDER
+from isl_vocab import get_vocabulary
+from isl_cache import cache_from_env, translation_key
+from isl_sigml import SIGML_DIR, SigmlBundler, SigmlIndex
 
 app = FastAPI(title="English → ISL Token API (Stanford-enabled)")
 
 # default path to vocab file (change if needed)
 WORDS_FILE = os.environ.get("ISL_WORDS_FILE", "words.txt")
 
+# LRU cache in front of text_to_isl (ISL_CACHE_ENTRIES / ISL_CACHE_BYTES / ISL_CACHE_DB)
+translation_cache = cache_from_env()
+
+# per-sign SiGML fragments parsed once; merged + gzipped bundles cached by sequence (ISL_SIGML_DIR / ISL_SIGML_CACHE_BYTES)
+sigml_bundler = SigmlBundler(SigmlIndex(SIGML_DIR))
+
+# batch endpoint limits: max items per request, texts per stanza/parser pass
+BATCH_MAX_ITEMS = int(os.environ.get("ISL_BATCH_MAX_ITEMS", "10000"))
+BATCH_CHUNK = int(os.environ.get("ISL_BATCH_CHUNK", "64"))
+
+# process pool doing the tokenization (ISL_WORKERS / ISL_MAX_CONCURRENCY / ISL_MAX_QUEUE / ISL_REQUEST_TIMEOUT)
+tokenizer_pool = TokenizerPool(WORDS_FILE)
+
 class ToIslRequest(BaseModel):
     text: str
+    reorder: Optional[str] = None  # "stanford" | "rules" | "none" (default: ISL_REORDER)
 
 class ToIslResponse(BaseModel):
     input: str
@@ -20,28 +46,51 @@ class ToIslResponse(BaseModel):
     missing_original_words: List[str]  # original words that needed character fallback
     meta: dict = {}
 
-@app.post("/to_isl", response_model=ToIslResponse)
-def to_isl(req: ToIslRequest):
-    text = req.text.strip()
-    if not text:
-        raise HTTPException(status_code=400, detail="Empty text")
+class ToIslBatchRequest(BaseModel):
+    texts: List[str]
+    reorder: Optional[str] = None
+    stream: bool = False  # respond with NDJSON, one item per line, as results become ready
+
+class ToIslBatchItem(BaseModel):
+    index: int
+    result: Optional[ToIslResponse] = None
+    error: Optional[str] = None
+
+class ToIslBatchResponse(BaseModel):
+    results: List[ToIslBatchItem]
+
+@app.on_event("startup")
+async def load_models():
+    # workers load stanza + bring up their resident Stanford parser once, not on the first request
+    await tokenizer_pool.warmup()
 
+@app.on_event("shutdown")
+def stop_workers():
+    tokenizer_pool.close()
+
+@app.get("/health")
+async def health():
     try:
-        tokens, filenames, meta = text_to_isl(text, WORDS_FILE)
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        # If something unexpected happens, return a helpful error
-        raise HTTPException(status_code=500, detail=f"tokenization failed: {e}")
+        parser = await tokenizer_pool.run(worker_health, timeout=5)
+    except (PoolOverloaded, asyncio.TimeoutError, BrokenProcessPool) as e:
+        parser = {"error": str(e) or "timeout"}
+    return {"status": "ok", "parser": parser, "workers": tokenizer_pool.stats(),
+            "batcher": {mode: b.stats() for mode, b in micro_batchers.items()}, "cache": translation_cache.stats(),
+            "sigml": sigml_bundler.stats()}
+
+@app.get("/cache/stats")
+def cache_stats():
+    return translation_cache.stats()
 
+def _build_response(text: str, tokens: List[str], filenames: List[str], meta: dict) -> ToIslResponse:
     # missing_original_words: tokens of length 1 and not present in words.txt (best-effort)
     missing = []
     try:
-        valid_text = open(WORDS_FILE, 'r', encoding='utf-8').read().lower()
+        valid_set = get_vocabulary(WORDS_FILE).words
     except Exception:
-        valid_text = ""
+        valid_set = frozenset()
     for t in tokens:
-        if len(t) == 1 and t.lower() not in valid_text:
+        if len(t) == 1 and t.lower() not in valid_set:
             missing.append(t)
 
     return ToIslResponse(
@@ -52,6 +101,171 @@ def to_isl(req: ToIslRequest):
         meta=meta
     )
 
+async def _translate(texts: List[str], reorder: str = DEFAULT_REORDER) -> list:
+    """Run a chunk of texts through the worker pool, mapping pool errors to HTTP errors."""
+    try:
+        return await tokenizer_pool.run(translate_chunk, texts, WORDS_FILE, reorder)
+    except PoolOverloaded:
+        raise HTTPException(status_code=429, detail="Server busy, retry later", headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="tokenization timed out")
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="tokenizer worker crashed, retry later")
+
+def _reorder_mode(reorder: Optional[str]) -> str:
+    reorder = reorder or DEFAULT_REORDER
+    if reorder not in REORDER_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"reorder must be one of {list(REORDER_BACKENDS)}")
+    return reorder
+
+def _cache_key(text: str, reorder: str) -> str:
+    return translation_key(text, get_vocabulary(WORDS_FILE).version + ":" + reorder)
+
+# collects concurrent /to_isl cache misses into one pipeline batch (ISL_BATCH_WINDOW_MS / ISL_BATCH_MAX_DOCS),
+# one batcher per reorder backend so a batch never mixes backends
+micro_batchers = {mode: MicroBatcher(partial(_translate, reorder=mode)) for mode in REORDER_BACKENDS}
+
+async def _translate_one(req: ToIslRequest):
+    """(text, tokens, filenames, meta) for a single request, through the cache and micro-batcher."""
+    text = req.text.strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="Empty text")
+
+    reorder = _reorder_mode(req.reorder)
+    try:
+        key = _cache_key(text, reorder)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    cached = translation_cache.get(key)
+    if cached is not None:
+        tokens, filenames, meta = cached
+        return text, tokens, filenames, dict(meta, cache="hit")
+    out = await micro_batchers[reorder].submit(text)
+    if isinstance(out, str):
+        # If something unexpected happens, return a helpful error
+        raise HTTPException(status_code=500, detail=out)
+    tokens, filenames, meta = out
+    translation_cache.put(key, [tokens, filenames, meta])
+    return text, tokens, filenames, dict(meta, cache="miss")
+
+@app.post("/to_isl", response_model=ToIslResponse)
+async def to_isl(req: ToIslRequest):
+    return _build_response(*await _translate_one(req))
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+@app.post("/to_isl/sigml")
+async def to_isl_sigml(req: ToIslRequest, request: Request):
+    """
+    Same input as /to_isl, but the answer is one <sigml> document with every
+    sign of the sentence in order (gzip when the client accepts it), so an
+    avatar player needs a single round trip instead of one fetch per filename.
+    Tokens and filenames without a sign file come back in X-ISL-* headers.
+    """
+    if not sigml_bundler.index.available:
+        raise HTTPException(status_code=503, detail=f"SiGML folder not found: {sigml_bundler.index.folder}")
+    text, tokens, filenames, meta = await _translate_one(req)
+    bundle = sigml_bundler.get(filenames)
+    headers = {
+        "ETag": bundle.etag,
+        "Vary": "Accept-Encoding",
+        "X-ISL-Tokens": quote(" ".join(tokens), safe=" "),
+        "X-ISL-Missing": quote(" ".join(bundle.missing), safe=" "),
+        "X-ISL-Cache": meta.get("cache", ""),
+    }
+    gz = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    if gz:
+        headers["ETag"] = bundle.etag[:-1] + '-gz"'  # each encoding needs its own strong validator
+        headers["Content-Encoding"] = "gzip"
+    inm = request.headers.get("if-none-match", "")
+    if headers["ETag"] in [t.strip().removeprefix("W/") for t in inm.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(bundle.gzipped if gz else bundle.body, media_type="application/xml", headers=headers)
+
+async def _iter_batch(texts: List[str], reorder: str):
+    """
+    Yield a ToIslBatchItem per input, in input order, as soon as it is ready.
+    Identical inputs are translated once; cached ones never reach the pipeline.
+    """
+    stripped = [t.strip() for t in texts]
+    keys = [_cache_key(t, reorder) if t else None for t in stripped]
+
+    done = {}  # key -> (tokens, filenames, meta) or error message
+    misses = []  # unique uncached keys, in first-occurrence order
+    first_text = {}
+    for key, text in zip(keys, stripped):
+        if key is None or key in done or key in first_text:
+            continue
+        cached = translation_cache.get(key)
+        if cached is not None:
+            tokens, filenames, meta = cached
+            done[key] = (tokens, filenames, dict(meta, cache="hit"))
+        else:
+            first_text[key] = text
+            misses.append(key)
+
+    next_index = 0
+
+    def ready_items():
+        nonlocal next_index
+        items = []
+        while next_index < len(texts):
+            key = keys[next_index]
+            if key is None:
+                item = ToIslBatchItem(index=next_index, error="Empty text")
+            elif key not in done:
+                break
+            elif isinstance(done[key], str):
+                item = ToIslBatchItem(index=next_index, error=done[key])
+            else:
+                item = ToIslBatchItem(index=next_index, result=_build_response(stripped[next_index], *done[key]))
+            next_index += 1
+            items.append(item)
+        return items
+
+    for item in ready_items():
+        yield item
+    for start in range(0, len(misses), BATCH_CHUNK):
+        chunk = misses[start:start + BATCH_CHUNK]
+        try:
+            outs = await _translate([first_text[k] for k in chunk], reorder)
+        except HTTPException as e:
+            # busy / timed out: report it on this chunk's items and carry on with the rest
+            outs = [e.detail] * len(chunk)
+        for key, out in zip(chunk, outs):
+            if isinstance(out, str):
+                done[key] = out
+                continue
+            tokens, filenames, meta = out
+            translation_cache.put(key, [tokens, filenames, meta])
+            done[key] = (tokens, filenames, dict(meta, cache="miss"))
+        for item in ready_items():
+            yield item
+
+@app.post("/to_isl/batch", response_model=ToIslBatchResponse)
+async def to_isl_batch(req: ToIslBatchRequest):
+    if not req.texts:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    if len(req.texts) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch larger than {BATCH_MAX_ITEMS} items")
+    reorder = _reorder_mode(req.reorder)
+    try:
+        get_vocabulary(WORDS_FILE)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if req.stream:
+        async def lines():
+            async for item in _iter_batch(req.texts, reorder):
+                yield json.dumps(jsonable_encoder(item)) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    return ToIslBatchResponse(results=[item async for item in _iter_batch(req.texts, reorder)])
+
 if __name__ == "__main__":
     # Start with: python isl_api.py  (this runs using uvicorn below)
     import uvicorn
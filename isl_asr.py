@@ -0,0 +1,118 @@
+# isl_asr.py
+"""
+ASR backend registry for the speech front-ends.
+
+Resolves device, compute type and model size from config and the hardware
+actually present, loads each model once per process and caps its threads,
+so the same scripts run on GPU boxes and CPU-only nodes.
+
+Backends (native model objects are returned, so callers keep their API):
+  faster-whisper  - CTranslate2; int8 / int8_float32 quantized on CPU
+  openai-whisper  - PyTorch reference implementation
+
+Config (env; "auto" = decide from hardware):
+  ISL_ASR_DEVICE        auto | cpu | cuda
+  ISL_ASR_MODEL         auto | tiny.en | base.en | small.en | medium.en | ...
+  ISL_ASR_COMPUTE_TYPE  auto | int8 | int8_float32 | float32 | float16 | ...
+  ISL_ASR_CPU_THREADS   threads per model on CPU (default: usable cores, max 8)
+  ISL_ASR_NUM_WORKERS   faster-whisper transcribe() calls that may run in parallel
+"""
+import os
+import threading
+from typing import Dict
+
+ASR_DEVICE = os.environ.get("ISL_ASR_DEVICE", "auto")
+ASR_MODEL = os.environ.get("ISL_ASR_MODEL", "auto")
+ASR_COMPUTE_TYPE = os.environ.get("ISL_ASR_COMPUTE_TYPE", "auto")
+ASR_NUM_WORKERS = int(os.environ.get("ISL_ASR_NUM_WORKERS", "1"))
+
+# model size by device when ISL_ASR_MODEL=auto; CPU scales with usable cores
+GPU_MODEL = "medium.en"
+CPU_MODELS = [(8, "small.en"), (4, "base.en"), (0, "tiny.en")]
+
+
+def usable_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+ASR_CPU_THREADS = int(os.environ.get("ISL_ASR_CPU_THREADS", str(min(usable_cpus(), 8))))
+
+
+def cuda_available(backend: str) -> bool:
+    """Is there a GPU this backend can use (checked without loading a model)?"""
+    try:
+        if backend == "faster-whisper":
+            import ctranslate2
+            return ctranslate2.get_cuda_device_count() > 0
+        import torch
+        return torch.cuda.is_available()
+    except Exception:
+        return False
+
+
+def _load_faster_whisper(cfg):
+    from faster_whisper import WhisperModel
+    return WhisperModel(cfg["model"], device=cfg["device"], compute_type=cfg["compute_type"],
+                        cpu_threads=cfg["cpu_threads"], num_workers=cfg["num_workers"])
+
+
+def _load_openai_whisper(cfg):
+    import torch
+    import whisper
+    if cfg["device"] == "cpu":
+        torch.set_num_threads(cfg["cpu_threads"])
+    return whisper.load_model(cfg["model"], device=cfg["device"])
+
+
+ASR_BACKENDS = {
+    "faster-whisper": _load_faster_whisper,
+    "openai-whisper": _load_openai_whisper,
+}
+
+
+def asr_config(backend: str = "faster-whisper", model: str = None, device: str = None,
+               compute_type: str = None) -> Dict:
+    """Resolved settings for `backend`; explicit arguments beat env, env beats "auto"."""
+    if backend not in ASR_BACKENDS:
+        raise ValueError(f"unknown ASR backend {backend!r} (expected one of {sorted(ASR_BACKENDS)})")
+    device = device or ASR_DEVICE
+    if device == "auto":
+        device = "cuda" if cuda_available(backend) else "cpu"
+    model = model or ASR_MODEL
+    if model == "auto":
+        cores = usable_cpus()
+        model = GPU_MODEL if device == "cuda" else next(m for n, m in CPU_MODELS if cores >= n)
+    compute_type = compute_type or ASR_COMPUTE_TYPE
+    if compute_type == "auto":
+        compute_type = "float16" if device == "cuda" else "int8"
+    return {
+        "backend": backend,
+        "model": model,
+        "device": device,
+        "compute_type": compute_type if backend == "faster-whisper" else ("float16" if device == "cuda" else "float32"),
+        "fp16": device == "cuda",
+        "cpu_threads": ASR_CPU_THREADS,
+        "num_workers": ASR_NUM_WORKERS,
+    }
+
+
+# ---------------- process-wide models ----------------
+_models: Dict[tuple, object] = {}
+_models_lock = threading.Lock()
+
+
+def get_asr_model(backend: str = "faster-whisper", model: str = None, device: str = None,
+                  compute_type: str = None):
+    """Shared model for the resolved config (loaded once per process)."""
+    cfg = asr_config(backend, model, device, compute_type)
+    key = (backend, cfg["model"], cfg["device"], cfg["compute_type"])
+    m = _models.get(key)
+    if m is None:
+        with _models_lock:
+            m = _models.get(key)
+            if m is None:
+                m = _models[key] = ASR_BACKENDS[backend](cfg)
+    return m
@@ -0,0 +1,95 @@
+# isl_audio.py
+"""
+In-memory audio for the speech front-ends.
+
+Whisper (openai-whisper and faster-whisper) accepts a mono float32 NumPy
+array at 16 kHz in place of a file name. These helpers turn what the capture
+libraries hand back (speech_recognition AudioData, PyAudio int16 buffers,
+sounddevice arrays) into that array without touching the disk.
+"""
+import threading
+
+import numpy as np
+
+WHISPER_RATE = 16000
+
+
+def pcm16_to_float32(data: bytes, channels: int = 1) -> np.ndarray:
+    """Little-endian int16 PCM bytes -> mono float32 in [-1, 1]."""
+    samples = np.frombuffer(data, dtype="<i2")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples.astype(np.float32) / 32768.0
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int = WHISPER_RATE) -> np.ndarray:
+    """Linear-interpolation resample; a no-op when the rates already match."""
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples
+    n_out = int(round(len(samples) * dst_rate / src_rate))
+    positions = np.arange(n_out, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def audio_data_to_array(audio_data) -> np.ndarray:
+    """speech_recognition.AudioData -> Whisper-ready float32 array."""
+    # AudioData converts rate/width itself; ask for 16 kHz int16 directly
+    raw = audio_data.get_raw_data(convert_rate=WHISPER_RATE, convert_width=2)
+    return pcm16_to_float32(raw)
+
+
+def pyaudio_frames_to_array(frames, rate: int = WHISPER_RATE, channels: int = 1) -> np.ndarray:
+    """List of paInt16 buffers from stream.read() -> Whisper-ready float32 array."""
+    return resample(pcm16_to_float32(b"".join(frames), channels), rate)
+
+
+def sounddevice_to_array(recording: np.ndarray, rate: int = WHISPER_RATE) -> np.ndarray:
+    """sd.rec() output (frames x channels, any dtype) -> Whisper-ready float32 array."""
+    samples = np.asarray(recording)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    if samples.dtype == np.int16:
+        samples = samples.astype(np.float32) / 32768.0
+    return resample(np.ascontiguousarray(samples, dtype=np.float32), rate)
+
+
+class RingBuffer:
+    """
+    Fixed-size float32 sample buffer addressed by absolute sample index.
+    One thread writes (capture), others read copies of any still-held range.
+    """
+
+    def __init__(self, seconds: float, rate: int = WHISPER_RATE):
+        self.rate = rate
+        self.capacity = int(seconds * rate)
+        self._buf = np.zeros(self.capacity, dtype=np.float32)
+        self._lock = threading.Lock()
+        self.total = 0  # samples ever written
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+        with self._lock:
+            start = (self.total + n - len(samples)) % self.capacity
+            first = min(len(samples), self.capacity - start)
+            self._buf[start:start + first] = samples[:first]
+            self._buf[:len(samples) - first] = samples[first:]
+            self.total += n
+
+    @property
+    def oldest(self) -> int:
+        """Absolute index of the oldest sample still held."""
+        return max(0, self.total - self.capacity)
+
+    def read(self, start: int, end: int = None) -> np.ndarray:
+        """Copy of samples [start, end); start is clamped to what is still held."""
+        with self._lock:
+            end = self.total if end is None else min(end, self.total)
+            start = max(start, self.total - self.capacity)
+            if start >= end:
+                return np.zeros(0, dtype=np.float32)
+            i, j = start % self.capacity, end % self.capacity
+            if i < j or j == 0:
+                return self._buf[i:j or self.capacity].copy()
+            return np.concatenate((self._buf[i:], self._buf[:j]))
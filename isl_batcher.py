@@ -0,0 +1,84 @@
+# isl_batcher.py
+"""
+Dynamic micro-batching for /to_isl.
+
+Concurrent requests are collected for a short window (ISL_BATCH_WINDOW_MS) or
+until ISL_BATCH_MAX_DOCS texts are waiting, then run through the pipeline as
+one batch (one stanza bulk_process + one parser batch). Each caller gets its
+own result back. Identical texts waiting in the same window share one slot.
+"""
+import os
+import asyncio
+from typing import Awaitable, Callable, Dict, List
+
+WINDOW_MS = float(os.environ.get("ISL_BATCH_WINDOW_MS", "10"))
+MAX_DOCS = int(os.environ.get("ISL_BATCH_MAX_DOCS", "32"))
+
+
+class MicroBatcher:
+    def __init__(self, process_batch: Callable[[List[str]], Awaitable[list]],
+                 window_ms: float = WINDOW_MS, max_docs: int = MAX_DOCS):
+        self.process_batch = process_batch
+        self.window = window_ms / 1000.0
+        self.max_docs = max(1, max_docs)
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._timer = None
+        # the loop only keeps weak references to tasks: hold in-flight batches until they finish
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+
+    async def submit(self, text: str):
+        """Queue `text` for the next batch and wait for its result."""
+        self.requests += 1
+        if self.window <= 0:
+            self.batches += 1
+            self.items += 1
+            return (await self.process_batch([text]))[0]
+
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(text, []).append(fut)
+        if len(self._pending) >= self.max_docs:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self.batches += 1
+        self.items += len(batch)
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[str, List[asyncio.Future]]):
+        texts = list(batch)
+        try:
+            results = await self.process_batch(texts)
+        except Exception as e:
+            for futs in batch.values():
+                for fut in futs:
+                    if not fut.done():
+                        fut.set_exception(e)
+            return
+        for text, result in zip(texts, results):
+            for fut in batch[text]:
+                if not fut.done():
+                    fut.set_result(result)
+
+    def stats(self):
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_docs": self.max_docs,
+            "requests": self.requests,
+            "batches": self.batches,
+            "in_flight": len(self._tasks),
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
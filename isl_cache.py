@@ -0,0 +1,122 @@
+# isl_cache.py
+"""
+Bounded, thread-safe LRU cache with an optional on-disk (sqlite) tier.
+
+Used in front of text_to_isl so repeated phrases ("are you ok", "thank you",
+repeated caption fragments) skip stanza, the parser and vocabulary mapping.
+Values must be JSON-serializable; their JSON size is what counts against
+max_bytes and what is stored on disk.
+"""
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def translation_key(text: str, vocab_version: str) -> str:
+    """Cache key: whitespace-normalized input + vocabulary version."""
+    return vocab_version + "\x1f" + " ".join(text.split())
+
+
+class LRUCache:
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 32 * 1024 * 1024,
+                 disk_path: Optional[str] = None, max_disk_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries or max_entries * 10
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self._db = None
+        self._disk_puts = 0
+        if disk_path:
+            import sqlite3  # only the disk tier needs it; keeps `import isl_tokenizer` light
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._insert(key, value, len(row[0]))
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any):
+        blob = json.dumps(value)
+        with self._lock:
+            self._insert(key, value, len(blob))
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, blob))
+                self._disk_puts += 1
+                if self._disk_puts % 256 == 0:
+                    self._prune_disk()
+                self._db.commit()
+
+    def _prune_disk(self):
+        # oldest writes go first (INSERT OR REPLACE gives rewritten keys a fresh rowid)
+        count = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count > self.max_disk_entries:
+            self._db.execute("DELETE FROM cache WHERE rowid IN "
+                             "(SELECT rowid FROM cache ORDER BY rowid LIMIT ?)",
+                             (count - self.max_disk_entries,))
+
+    def _insert(self, key: str, value: Any, size: int):
+        if size > self.max_bytes:
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._data[key] = (value, size)
+        self._bytes += size
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._data.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "disk": self._db is not None,
+            }
+
+
+def cache_from_env(prefix: str = "ISL_CACHE") -> LRUCache:
+    """Build an LRUCache from <prefix>_ENTRIES / <prefix>_BYTES / <prefix>_DB env vars."""
+    return LRUCache(max_entries=int(os.environ.get(prefix + "_ENTRIES", "4096")),
+                    max_bytes=int(os.environ.get(prefix + "_BYTES", str(32 * 1024 * 1024))),
+                    disk_path=os.environ.get(prefix + "_DB") or None)
@@ -1,30 +1,116 @@
 // background.js
 
-chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
-  // 1. HANDLE AUDIO PROCESSING
-  if (request.action === "processAudio") {
-    
-    // Convert Array back to Blob
-    const uint8Array = new Uint8Array(request.audioData);
-    const blob = new Blob([uint8Array], { type: 'audio/webm;codecs=opus' });
+const SERVER = "localhost:5000";
 
-    const formData = new FormData();
-    formData.append("audio_chunk", blob, "chunk.webm");
+// One persistent WebSocket per recording: chunks go up as binary frames,
+// results come back as soon as the server has them and are pushed to the tab.
+const sockets = {};        // sessionId -> { ws, tabId, opened, ending, backlog }
+const httpFallback = new Map(); // sessions whose socket never opened: sessionId -> last queued request
+
+// HTTP requests of one session go out one at a time and in order: the decoder
+// needs the chunks in sequence, and /end-session must come after the last one
+function enqueueHttp(sessionId, send) {
+  const next = (httpFallback.get(sessionId) || Promise.resolve()).then(send);
+  httpFallback.set(sessionId, next);
+  return next;
+}
 
-    // Fetch to Localhost (Bypasses YouTube CORS)
-    fetch("http://localhost:5000/process-audio", {
-      method: "POST",
-      body: formData
-    })
+function postChunk(sessionId, chunk) {
+  const blob = new Blob([chunk], { type: 'audio/webm;codecs=opus' });
+  const formData = new FormData();
+  formData.append("audio_chunk", blob, "chunk.webm");
+  formData.append("session_id", sessionId);
+
+  // Fetch to Localhost (Bypasses YouTube CORS)
+  return fetch(`http://${SERVER}/process-audio`, { method: "POST", body: formData })
     .then(response => response.json())
-    .then(data => {
-      sendResponse({ success: true, data: data });
-    })
+    .then(data => ({ success: true, data: data }))
     .catch(error => {
       console.error("API Error:", error);
-      sendResponse({ success: false, error: error.message });
+      return { success: false, error: error.message };
     });
+}
+
+function openSocket(sessionId, tabId) {
+  const entry = { ws: null, tabId, opened: false, ending: false, backlog: [] };
+  const ws = new WebSocket(`ws://${SERVER}/stream?session_id=${encodeURIComponent(sessionId)}`);
+  ws.binaryType = "arraybuffer";
+  entry.ws = ws;
+
+  ws.onopen = () => {
+    entry.opened = true;
+    entry.backlog.forEach(chunk => ws.send(chunk));
+    entry.backlog = [];
+    if (entry.ending) ws.send(JSON.stringify({ type: "end" }));
+  };
+  ws.onmessage = (event) => {
+    const message = JSON.parse(event.data);
+    chrome.tabs.sendMessage(tabId, { action: "islResult", sessionId, message });
+    if (message.type === "done") ws.close();
+  };
+  ws.onclose = () => {
+    delete sockets[sessionId];
+    if (!entry.opened) {
+      // server without /stream (or not up yet): same session over plain HTTP
+      const toTab = response => chrome.tabs.sendMessage(tabId, { action: "islResponse", sessionId, response });
+      entry.backlog.forEach(chunk => enqueueHttp(sessionId, () => postChunk(sessionId, chunk)).then(toTab));
+      if (entry.ending) endSessionHttp(sessionId).then(toTab);
+    } else if (!entry.ending) {
+      chrome.tabs.sendMessage(tabId, { action: "islResult", sessionId,
+        message: { type: "error", error: "connection to ISL server lost" } });
+    }
+  };
+
+  sockets[sessionId] = entry;
+  return entry;
+}
+
+// the reply carries the results still queued at the end, the flushed last utterance included
+function endSessionHttp(sessionId) {
+  return enqueueHttp(sessionId, () => {
+    const formData = new FormData();
+    formData.append("session_id", sessionId);
+    return fetch(`http://${SERVER}/end-session`, { method: "POST", body: formData })
+      .then(response => response.json())
+      .then(data => ({ success: true, data: data }))
+      .catch(error => {
+        console.error("API Error:", error);
+        return { success: false, error: error.message };
+      });
+  }).then(response => {
+    httpFallback.delete(sessionId);
+    return response;
+  });
+}
+
+chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
+  // 1. HANDLE AUDIO PROCESSING
+  if (request.action === "processAudio") {
+    const chunk = new Uint8Array(request.audioData).buffer;
+
+    if (httpFallback.has(request.sessionId)) {
+      enqueueHttp(request.sessionId, () => postChunk(request.sessionId, chunk)).then(sendResponse);
+      return true; // Keep channel open for async response
+    }
+
+    const entry = sockets[request.sessionId] || openSocket(request.sessionId, sender.tab.id);
+    if (entry.opened) entry.ws.send(chunk);
+    else entry.backlog.push(chunk);
+    sendResponse({ success: true, streaming: true }); // results follow as "islResult" messages
+    return false;
+  }
 
-    return true; // Keep channel open for async response
+  // 2. END OF RECORDING: flush the last utterance and free the server-side decoder
+  if (request.action === "endSession") {
+    const entry = sockets[request.sessionId];
+    if (entry) {
+      entry.ending = true;
+      if (entry.opened) entry.ws.send(JSON.stringify({ type: "end" }));
+    } else if (httpFallback.has(request.sessionId)) {
+      endSessionHttp(request.sessionId).then(sendResponse);
+      return true;
+    }
+    sendResponse({ success: true, streaming: true }); // the last results follow as "islResult" messages
+    return false;
   }
-});
\ No newline at end of file
+});
@@ -80,17 +80,32 @@
       const options = MediaRecorder.isTypeSupported(mimeType) ? { mimeType } : {};
       
       mediaRecorder = new MediaRecorder(audioStream, options);
-
-      mediaRecorder.ondataavailable = async (event) => {
-        if (event.data.size > 0) {
-          const buffer = await event.data.arrayBuffer();
+      // one server-side decoder + queue per recording
+      const recordingId = crypto.randomUUID();
+
+      // each chunk is sent once the previous one has been handed over, so they arrive in
+      // order and endSession goes out only after the last chunk (arrayBuffer() is async)
+      let sending = Promise.resolve();
+
+      mediaRecorder.ondataavailable = (event) => {
+        if (event.data.size === 0) return;
+        const blob = event.data;
+        sending = sending.then(async () => {
+          const buffer = await blob.arrayBuffer();
           const dataArray = Array.from(new Uint8Array(buffer));
 
-          chrome.runtime.sendMessage({
+          await new Promise(resolve => chrome.runtime.sendMessage({
             action: "processAudio",
-            audioData: dataArray
-          });
-        }
+            audioData: dataArray,
+            sessionId: recordingId
+          }, response => { handleResponse(response); resolve(); }));
+        });
+      };
+
+      // the final chunk is delivered before onstop; the reply carries the last results
+      mediaRecorder.onstop = () => {
+        sending = sending.then(() => chrome.runtime.sendMessage(
+          { action: "endSession", sessionId: recordingId }, handleResponse));
       };
 
       // 4. Start recording
@@ -123,6 +138,28 @@
     videoQueue = [];
   }
 
+  // --- RESULTS ---
+  // HTTP fallback: each reply carries whatever finished since the last chunk;
+  // a result's video_url is its signs stitched into one clip (else play them one by one)
+  function handleResponse(response) {
+    if (!response) return;
+    if (!response.success) return console.error("ISL server:", response.error);
+    if (!response.data) return;
+    (response.data.results || []).forEach(r => {
+      if (r.video_url) queueVideo(r.video_url);
+      else (r.video_urls || []).forEach(queueVideo);
+    });
+  }
+
+  // WebSocket: background.js pushes every result the moment the server sends it
+  chrome.runtime.onMessage.addListener((request) => {
+    if (request.action === "islResponse") return handleResponse(request.response);
+    if (request.action !== "islResult") return;
+    const msg = request.message;
+    if (msg.type === "sign" && msg.url) queueVideo(msg.url);
+    else if (msg.type === "error") console.error("ISL server:", msg.error);
+  });
+
   // --- QUEUE LOGIC ---
   function queueVideo(url) {
     videoQueue.push(url);
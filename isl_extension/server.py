@@ -1,32 +1,636 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+# server.py
+"""
+Transcription server for the ISL browser extension.
+
+Each tab streams MediaRecorder chunks (webm/opus, ~1 s each) to
+POST /process-audio with its session_id. Per session:
+
+  chunks -> ffmpeg (one long-running decoder per session, stdin/stdout pipes,
+            so continuation chunks without a webm header decode correctly)
+         -> 16 kHz PCM -> VAD segmenter (isl_vad) -> utterances
+
+Utterances go to a shared worker pool running ASR (isl_asr, one model per
+process) -> gloss (isl_speech/gloss_engine) -> sign asset URLs. The pool
+takes sessions round-robin with at most one job in flight per session, and
+each session's backlog is capped (oldest utterance dropped), so one noisy
+tab cannot starve the others. Results are returned on the session's next
+request; POST /end-session flushes the last utterance and answers once it
+(and everything else queued for the session) is done. An ended session id
+is remembered, and later chunks for it are refused with 410: they carry no
+webm header, so a fresh decoder could not read them.
+
+For HTTP sessions each result also carries one `video_url`: the utterance's
+clips stitched into a single MP4 (isl_speech/sign_stitcher), cached on disk
+by content hash and served from GET /stitched/<key>.mp4 with a strong ETag,
+If-None-Match and byte ranges, so a repeated phrase is one static-file hit.
+The stitched sequence is the utterance's gloss_engine gloss, i.e. the same
+signs as its `video_urls` and /stream "sign" messages, not text_to_isl's
+tokens: those follow a different vocabulary (words.txt / SiGML names, letter
+fallbacks) and order, and would need stanza plus the Stanford JVM in this
+process.
+
+WS /stream is the persistent alternative: binary messages are the same
+chunks, and the server pushes each result the moment a worker finishes it
+(one "transcript" message, then one "sign" message per gloss token), with
+shorter utterances (ISL_EXT_STREAM_MAX_UTTERANCE_S) so playback can start
+while the speaker is still talking.
+
+Config (env):
+  ISL_FFMPEG              ffmpeg binary (default: ffmpeg)
+  ISL_EXT_WORKERS         inference threads (default: ISL_ASR_NUM_WORKERS)
+  ISL_EXT_SESSION_QUEUE   utterances a session may have waiting
+  ISL_EXT_SESSION_TTL     seconds without a chunk before a session is closed
+  ISL_EXT_STREAM_MAX_UTTERANCE_S  VAD cut for /stream sessions
+  ISL_SIGN_ASSET_DIR      folder of <GLOSS>.mp4 (.webm, ...) clips, served under /signs/
+  ISL_EXT_STITCH          1 = stitch each HTTP result into one clip (default), 0 = off
+  ISL_STITCH_CACHE_DIR / ISL_STITCH_CACHE_MB / ISL_STITCH_WIDTH / ISL_STITCH_FPS  see sign_stitcher
+  ISL_EXT_PORT            port for `python server.py`
+"""
 import os
+import sys
+import json
+import time
+import asyncio
+import uuid
+import threading
+import subprocess
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+for _p in (ROOT, os.path.join(ROOT, "isl_speech")):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+
+from isl_asr import ASR_NUM_WORKERS, asr_config, get_asr_model
+from isl_audio import WHISPER_RATE, pcm16_to_float32
+from isl_vad import Segmenter
+from sign_assets import SignAssetIndex
+from sign_stitcher import StitchCache
+
+FFMPEG = os.environ.get("ISL_FFMPEG", "ffmpeg")
+WORKERS = int(os.environ.get("ISL_EXT_WORKERS", str(max(1, ASR_NUM_WORKERS))))
+SESSION_QUEUE = int(os.environ.get("ISL_EXT_SESSION_QUEUE", "4"))
+SESSION_TTL = float(os.environ.get("ISL_EXT_SESSION_TTL", "60"))
+STREAM_MAX_UTTERANCE_S = float(os.environ.get("ISL_EXT_STREAM_MAX_UTTERANCE_S", "5"))
+SIGN_ASSET_DIR = os.environ.get("ISL_SIGN_ASSET_DIR", os.path.join(ROOT, "signs"))
+STITCH = os.environ.get("ISL_EXT_STITCH", "1") != "0"
+PORT = int(os.environ.get("ISL_EXT_PORT", "5000"))
+MAX_CHUNK_BYTES = 4 * 1024 * 1024
+END_WAIT_S = 30.0       # how long ending a session waits for its queued utterances
+ENDED_SESSIONS = 4096   # ended session ids remembered, so their late chunks are refused
+READ_BYTES = WHISPER_RATE * 2 // 10  # 100 ms of s16le per read
+
+
+# ---------------- decoding ----------------
+class StreamDecoder:
+    """
+    One ffmpeg process per session: container chunks in on stdin, 16 kHz mono
+    s16le out on stdout. A reader thread hands PCM to `on_pcm`.
+    """
+
+    def __init__(self, on_pcm: Callable[[bytes], None]):
+        self.on_pcm = on_pcm
+        self.proc = subprocess.Popen(
+            [FFMPEG, "-hide_banner", "-loglevel", "error",
+             "-probesize", "4096", "-analyzeduration", "0", "-i", "pipe:0",
+             "-f", "s16le", "-ac", "1", "-ar", str(WHISPER_RATE), "-flush_packets", "1", "pipe:1"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        carry = b""
+        while True:
+            data = self.proc.stdout.read(READ_BYTES)
+            if not data:
+                break
+            data = carry + data
+            usable = len(data) - len(data) % 2
+            carry = data[usable:]
+            self.bytes_out += usable
+            if usable:
+                self.on_pcm(data[:usable])
+
+    def write(self, chunk: bytes):
+        self.bytes_in += len(chunk)
+        self.proc.stdin.write(chunk)
+
+    def close(self, timeout: float = 2.0):
+        """Close stdin and wait for the tail of the audio to come out."""
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        self._reader.join(timeout)
+        if self.proc.poll() is None:
+            self.proc.kill()
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+
+# ---------------- sessions ----------------
+class SessionEnded(RuntimeError):
+    """A chunk arrived for a session that was already closed; maps to HTTP 410."""
+
+
+class Session:
+    """
+    Per-tab state. Results go to `sink` when one is attached (WebSocket),
+    otherwise they wait in `results` for the next HTTP request. `stitch`
+    asks for one joined clip per result (HTTP clients play one video each).
+    """
+
+    def __init__(self, session_id: str, submit: Callable[["Session", object], None],
+                 sink: Callable[[dict], None] = None, max_utterance_s: float = None,
+                 stitch: bool = STITCH):
+        self.id = session_id
+        self.submit = submit
+        self.sink = sink
+        self.stitch = stitch
+        self.lock = threading.Lock()
+        self.segmenter = Segmenter() if max_utterance_s is None else Segmenter(max_utterance_s=max_utterance_s)
+        self.results: deque = deque(maxlen=64)
+        self.last_seen = time.monotonic()
+        self.chunks = 0
+        self.utterances = 0
+        self.closed = False
+        self.decoder = StreamDecoder(self._on_pcm)
+
+    def _on_pcm(self, pcm: bytes):
+        for utterance in self.segmenter.feed(pcm16_to_float32(pcm)):
+            self.utterances += 1
+            self.submit(self, utterance)
+
+    def feed(self, chunk: bytes):
+        self.last_seen = time.monotonic()
+        self.chunks += 1
+        with self.lock:
+            if self.closed:
+                raise SessionEnded(f"session {self.id} has ended")
+            if not self.decoder.alive:
+                # ffmpeg gave up (corrupt chunk); the next chunk has no header, so start clean
+                raise RuntimeError("decoder exited; restart the recording")
+            self.decoder.write(chunk)
+
+    def deliver(self, result: dict):
+        if self.sink is not None:
+            self.sink(result)
+        else:
+            self.results.append(result)
+
+    def take_results(self) -> List[dict]:
+        out = []
+        while self.results:
+            out.append(self.results.popleft())
+        return out
+
+    def close(self):
+        with self.lock:
+            # after this no chunk reaches the decoder, so the flush below sees all the audio
+            self.closed = True
+        self.decoder.close()
+        tail = self.segmenter.flush()
+        if tail is not None:
+            self.utterances += 1
+            self.submit(self, tail)
+
+    def stats(self):
+        return {"chunks": self.chunks, "utterances": self.utterances,
+                "decoded_s": self.decoder.bytes_out / 2 / WHISPER_RATE,
+                "idle_s": round(time.monotonic() - self.last_seen, 1)}
+
+
+# ---------------- fair worker pool ----------------
+class FairScheduler:
+    """
+    Worker threads serving per-session queues round-robin. A session has at
+    most one job running (its results stay in order) and at most
+    `per_session` waiting; beyond that its oldest job is dropped.
+    """
+
+    def __init__(self, handler: Callable[[Session, object], None], workers: int = WORKERS,
+                 per_session: int = SESSION_QUEUE):
+        self.handler = handler
+        self.per_session = max(1, per_session)
+        self._queues: Dict[str, deque] = {}
+        self._sessions: Dict[str, Session] = {}
+        self._ready: deque = deque()   # session ids with work and nothing running
+        self._running = set()
+        self._cond = threading.Condition()
+        self.completed = 0
+        self.dropped = 0
+        self.failed = 0
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(max(1, workers))]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, session: Session, job):
+        with self._cond:
+            q = self._queues.setdefault(session.id, deque())
+            self._sessions[session.id] = session
+            if len(q) >= self.per_session:
+                q.popleft()
+                self.dropped += 1
+            q.append(job)
+            if session.id not in self._running and session.id not in self._ready:
+                self._ready.append(session.id)
+                self._cond.notify()
+
+    def _next(self):
+        with self._cond:
+            while not self._ready:
+                self._cond.wait()
+            sid = self._ready.popleft()
+            self._running.add(sid)
+            return self._sessions[sid], self._queues[sid].popleft()
+
+    def _done(self, sid: str):
+        with self._cond:
+            self._running.discard(sid)
+            if self._queues.get(sid):
+                self._ready.append(sid)
+                self._cond.notify()
+            else:
+                self._queues.pop(sid, None)
+                self._sessions.pop(sid, None)
+
+    def _work(self):
+        while True:
+            session, job = self._next()
+            try:
+                self.handler(session, job)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                session.deliver({"error": str(e)})
+            finally:
+                self._done(session.id)
+
+    def pending(self, sid: str = None) -> int:
+        with self._cond:
+            if sid is not None:
+                return len(self._queues.get(sid, ())) + (sid in self._running)
+            return sum(len(q) for q in self._queues.values()) + len(self._running)
+
+    def stats(self):
+        return {"workers": len(self._threads), "per_session_queue": self.per_session,
+                "pending": self.pending(), "completed": self.completed,
+                "dropped": self.dropped, "failed": self.failed}
+
+
+# ---------------- ASR -> gloss -> assets ----------------
+asset_index = SignAssetIndex(SIGN_ASSET_DIR)
+stitcher = StitchCache(asset_index) if STITCH else None
+
+
+def asset_urls(gloss: List[str]) -> Tuple[List[str], List[str]]:
+    """Clip URL for every gloss word that has one; the rest are reported missing."""
+    urls, missing = [], []
+    for word in gloss:
+        info = asset_index.lookup(word)
+        if info is not None:
+            urls.append(f"/signs/{info.filename}")
+        else:
+            missing.append(word)
+    return urls, missing
+
+
+def stitched_url(gloss: List[str], urls: List[str]) -> Optional[str]:
+    """
+    One clip for the whole utterance (the gloss words that have a clip, in
+    gloss order, so it matches `urls`); None means play `urls` one by one.
+    """
+    if len(urls) < 2 or stitcher is None:
+        return urls[0] if urls else None
+    try:
+        key = stitcher.stitch(gloss)
+    except (OSError, RuntimeError) as e:
+        print(f"stitch failed ({' '.join(gloss)}): {e}", file=sys.stderr)
+        return None
+    return f"/stitched/{key}.mp4" if key else None
+
+
+def transcribe(samples) -> str:
+    segments, info = get_asr_model("faster-whisper").transcribe(samples, beam_size=1)
+    return " ".join(seg.text.strip() for seg in segments).strip()
+
+
+def process_utterance(session: Session, samples):
+    from gloss_engine import get_engine
+    t0 = time.perf_counter()
+    text = transcribe(samples)
+    if not text:
+        return
+    gloss = get_engine().gloss(text)
+    urls, missing = asset_urls(gloss)
+    session.deliver({"text": text, "gloss": gloss, "video_urls": urls, "missing": missing,
+                     "video_url": stitched_url(gloss, urls) if session.stitch else None,
+                     "audio_s": round(len(samples) / WHISPER_RATE, 2),
+                     "latency_ms": round((time.perf_counter() - t0) * 1000.0, 1)})
+
+
+scheduler = FairScheduler(process_utterance)
+sessions: Dict[str, Session] = {}
+ended_sessions: "OrderedDict[str, None]" = OrderedDict()
+sessions_lock = threading.Lock()
+
+
+def get_session(session_id: str, **kwargs) -> Session:
+    with sessions_lock:
+        session = sessions.get(session_id)
+        if session is None:
+            if session_id in ended_sessions:
+                raise SessionEnded(f"session {session_id} has ended")
+            session = sessions[session_id] = Session(session_id, scheduler.submit, **kwargs)
+        return session
+
+
+def close_session(session_id: str) -> Optional[Session]:
+    with sessions_lock:
+        session = sessions.pop(session_id, None)
+        if session is not None:
+            ended_sessions[session_id] = None
+            while len(ended_sessions) > ENDED_SESSIONS:
+                ended_sessions.popitem(last=False)
+    if session is not None:
+        session.close()
+    return session
+
+
+def reap_idle_sessions():
+    while True:
+        time.sleep(max(1.0, SESSION_TTL / 4))
+        asset_index.refresh()  # pick up clips added while running
+        now = time.monotonic()
+        for sid in [sid for sid, s in list(sessions.items()) if now - s.last_seen > SESSION_TTL]:
+            close_session(sid)
+
+
+# ---------------- HTTP ----------------
+app = FastAPI(title="ISL extension transcription server")
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+if os.path.isdir(SIGN_ASSET_DIR):
+    app.mount("/signs", StaticFiles(directory=SIGN_ASSET_DIR), name="signs")
+
+
+@app.on_event("startup")
+def load_models():
+    # load the shared ASR model and gloss engine now, not inside the first tab's request
+    from gloss_engine import get_engine
+    get_asr_model("faster-whisper")
+    get_engine()
+    threading.Thread(target=reap_idle_sessions, daemon=True).start()
+
+
+@app.on_event("shutdown")
+def close_sessions():
+    for sid in list(sessions):
+        close_session(sid)
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok", "asr": asr_config("faster-whisper"), "scheduler": scheduler.stats(),
+            "stitch": stitcher.stats() if stitcher is not None else None,
+            "sessions": {sid: s.stats() for sid, s in list(sessions.items())}}
+
+
+def _response(session: Session, message: str, request: Request):
+    results = session.take_results()
+    base = str(request.base_url).rstrip("/")
+    for r in results:
+        r["video_urls"] = [base + u for u in r.get("video_urls", [])]
+        if r.get("video_url"):
+            r["video_url"] = base + r["video_url"]
+    urls = [u for r in results for u in r["video_urls"]]
+    clips = [r["video_url"] for r in results if r.get("video_url")]
+    return {
+        "session_id": session.id,
+        "results": results,
+        "video_urls": urls,
+        "video_url": clips[0] if clips else (urls[0] if urls else None),  # single-URL clients
+        "pending": scheduler.pending(session.id),
+        "message": message,
+    }
+
+
+@app.post("/process-audio")
+def process_audio(request: Request, audio_chunk: UploadFile = File(...), session_id: Optional[str] = Form(None)):
+    chunk = audio_chunk.file.read(MAX_CHUNK_BYTES + 1)
+    if not chunk:
+        raise HTTPException(status_code=400, detail="empty audio chunk")
+    if len(chunk) > MAX_CHUNK_BYTES:
+        raise HTTPException(status_code=413, detail="audio chunk too large")
+    sid = session_id or uuid.uuid4().hex
+    try:
+        session = get_session(sid)
+        session.feed(chunk)
+    except SessionEnded as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except (OSError, RuntimeError) as e:
+        close_session(sid)
+        raise HTTPException(status_code=409, detail=str(e))
+    return _response(session, "chunk queued", request)
+
+
+@app.get("/results/{session_id}")
+def results(session_id: str, request: Request):
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="unknown session")
+    return _response(session, "ok", request)
+
+
+@app.post("/end-session")
+def end_session(request: Request, session_id: str = Form(...)):
+    """Close the session, wait for its queued utterances (the flushed tail included) and return them."""
+    session = close_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="unknown session")
+    deadline = time.monotonic() + END_WAIT_S
+    while scheduler.pending(session_id) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return _response(session, "session closed", request)
+
+
+# ---------------- stitched clips ----------------
+CLIP_CHUNK = 256 * 1024
+
+
+def _byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single "bytes=" range; None = send the whole file."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None  # multipart ranges are optional; a 200 is a valid answer
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start, end = int(first), int(last) if last else size - 1
+        else:
+            start, end = max(0, size - int(last)), size - 1  # suffix: the last N bytes
+    except ValueError:
+        return None
+    if first and last and end < start:
+        return None  # last-byte-pos before first-byte-pos: invalid, so the header is ignored
+    if start >= size:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, min(end, size - 1)
+
+
+def _read_range(f, start: int, length: int):
+    with f:
+        f.seek(start)
+        while length > 0:
+            data = f.read(min(CLIP_CHUNK, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+@app.api_route("/stitched/{name}", methods=["GET", "HEAD"])
+def stitched_clip(name: str, request: Request):
+    key, ext = os.path.splitext(name)
+    path = stitcher.lookup(key) if stitcher is not None and ext == ".mp4" else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="unknown clip")
+    etag = f'"{key}"'  # content-addressed: the key is a strong validator
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "public, max-age=31536000, immutable"}
+    inm = request.headers.get("if-none-match")
+    if inm and (inm.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in inm.split(",")]):
+        return Response(status_code=304, headers=headers)
+    try:
+        f = open(path, "rb")  # opened now, so eviction during the download can't cut it off
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="unknown clip")
+    size = os.fstat(f.fileno()).st_size
+    span = None
+    rng = request.headers.get("range")
+    if rng and request.headers.get("if-range", etag) == etag:
+        try:
+            span = _byte_range(rng, size)
+        except HTTPException:
+            f.close()
+            raise
+    start, end = span or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if span:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    status = 206 if span else 200
+    if request.method == "HEAD":
+        f.close()
+        return Response(status_code=status, headers=headers, media_type="video/mp4")
+    return StreamingResponse(_read_range(f, start, end - start + 1), status_code=status,
+                             headers=headers, media_type="video/mp4")
+
+
+def _sign_messages(result: dict, base: str) -> List[dict]:
+    if "error" in result:
+        return [{"type": "error", "error": result["error"]}]
+    urls = {os.path.splitext(u.rsplit("/", 1)[-1])[0].upper(): base + u for u in result["video_urls"]}
+    msgs = [{"type": "transcript", "text": result["text"], "gloss": result["gloss"],
+             "latency_ms": result["latency_ms"]}]
+    msgs += [{"type": "sign", "gloss": word, "url": urls.get(word)} for word in result["gloss"]]
+    return msgs
+
+
+def _control_type(text: str) -> Optional[str]:
+    """"type" of a JSON control frame, or None if the text isn't a JSON object."""
+    try:
+        obj = json.loads(text)
+    except ValueError:
+        return None
+    return obj.get("type") if isinstance(obj, dict) else None
+
+
+@app.websocket("/stream")
+async def stream(ws: WebSocket, session_id: Optional[str] = None):
+    """
+    Persistent channel: binary frames in (MediaRecorder chunks), JSON out.
+    Send {"type": "end"} to flush the last utterance; the server answers
+    {"type": "done"} once everything queued for the session has been sent.
+    """
+    await ws.accept()
+    sid = session_id or uuid.uuid4().hex
+    if sid in sessions:
+        await ws.close(code=4409, reason="session already active")
+        return
+    if sid in ended_sessions:
+        await ws.close(code=4410, reason="session has ended")
+        return
+    loop = asyncio.get_running_loop()
+    outbox: asyncio.Queue = asyncio.Queue()
+    base = str(ws.base_url).replace("ws", "http", 1).rstrip("/")
 
-app = Flask(__name__)
-CORS(app)  # This allows the Chrome Extension to talk to this server
+    def sink(result: dict):
+        # called on a worker thread
+        for msg in _sign_messages(result, base):
+            loop.call_soon_threadsafe(outbox.put_nowait, msg)
 
-@app.route('/process-audio', methods=['POST'])
-def process_audio():
-    # 1. Check if audio arrived
-    if 'audio_chunk' not in request.files:
-        return jsonify({"error": "No audio file provided"}), 400
+    # signs are pushed one by one as they arrive, so there is nothing to stitch
+    session = await run_in_threadpool(get_session, sid, sink=sink, max_utterance_s=STREAM_MAX_UTTERANCE_S,
+                                      stitch=False)
 
-    audio_file = request.files['audio_chunk']
-    
-    # 2. Print the size to prove we received it
-    audio_file.seek(0, os.SEEK_END)
-    size = audio_file.tell()
-    print(f"✅ RECEIVED AUDIO CHUNK: {size} bytes")
+    async def sender():
+        # the only task that writes to the socket; None ends it
+        while True:
+            msg = await outbox.get()
+            if msg is None:
+                return
+            await ws.send_json(msg)
 
-    # 3. Pretend we processed it and return a dummy video
-    # (This is a sample video URL for testing)
-    dummy_video = "https://www.w3schools.com/html/mov_bbb.mp4" 
+    await outbox.put({"type": "ready", "session_id": sid})
+    send_task = asyncio.create_task(sender())
+    try:
+        while True:
+            msg = await ws.receive()
+            if msg["type"] == "websocket.disconnect":
+                break
+            if msg.get("bytes"):
+                try:
+                    await run_in_threadpool(session.feed, msg["bytes"])
+                except (OSError, RuntimeError) as e:
+                    await outbox.put({"type": "error", "error": str(e)})
+                    break
+            elif msg.get("text"):
+                if _control_type(msg["text"]) != "end":
+                    # a bad control frame is the client's bug; report it and keep the session
+                    await outbox.put({"type": "error", "error": 'unknown control message, expected {"type": "end"}'})
+                    continue
+                await run_in_threadpool(close_session, sid)
+                deadline = loop.time() + END_WAIT_S
+                while scheduler.pending(sid) and loop.time() < deadline:
+                    await asyncio.sleep(0.05)
+                await outbox.put({"type": "done", "session_id": sid})
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if sessions.get(sid) is session:
+            await run_in_threadpool(close_session, sid)
+        await outbox.put(None)
+        try:
+            await asyncio.wait_for(send_task, timeout=5.0)
+        except Exception:
+            send_task.cancel()
+    try:
+        await ws.close()
+    except RuntimeError:
+        pass  # already closed by the client
 
-    return jsonify({
-        "video_url": dummy_video,
-        "message": "Chunk processed successfully"
-    })
 
 if __name__ == '__main__':
-    print("🚀 Fake ISL Model Server Running on port 5000...")
-    app.run(port=5000, debug=True)
\ No newline at end of file
+    import uvicorn
+    print(f"🚀 ISL Model Server Running on port {PORT}...")
+    uvicorn.run(app, host="127.0.0.1", port=PORT)
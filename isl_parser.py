@@ -0,0 +1,282 @@
+# isl_parser.py
+"""
+Long-lived Stanford parser backend.
+
+Instead of starting a new JVM (and reloading englishPCFG.ser.gz) for every
+sentence, we keep one or more resident `LexicalizedParserServer` processes
+(shipped inside stanford-parser.jar) and talk to them over a local socket.
+The pool is created once per process and shared by everything that imports
+isl_tokenizer (text_to_isl, isl_api, streamlit_app).
+
+The server parses one sentence per request, so a batch is one request per
+sentence, spread over the pool's workers (one JVM each, ISL_PARSER_WORKERS,
+by default half the CPUs, between 2 and 4).
+"""
+import os
+import sys
+import time
+import queue
+import shutil
+import socket
+import atexit
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict
+
+SERVER_CLASS = "edu.stanford.nlp.parser.server.LexicalizedParserServer"
+
+# tunables (env overridable)
+POOL_SIZE = int(os.environ.get("ISL_PARSER_WORKERS", str(min(4, max(2, (os.cpu_count() or 2) // 2)))))
+JAVA_OPTS = os.environ.get("ISL_PARSER_JAVA_OPTS", "-mx1g").split()
+STARTUP_TIMEOUT = float(os.environ.get("ISL_PARSER_STARTUP_TIMEOUT", "120"))
+REQUEST_TIMEOUT = float(os.environ.get("ISL_PARSER_REQUEST_TIMEOUT", "60"))
+# after a failed start, don't try again for this many seconds
+RETRY_BACKOFF = float(os.environ.get("ISL_PARSER_RETRY_BACKOFF", "60"))
+# a worker idle for longer than this is pinged before use (catches a hung JVM whose process is still up)
+PING_AFTER_IDLE = float(os.environ.get("ISL_PARSER_PING_AFTER_IDLE", "30"))
+
+
+class ParserUnavailable(RuntimeError):
+    """Raised when no resident parser can be started or reached."""
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _build_classpath(parser_jar: str) -> str:
+    # models jar sits next to the parser jar in the stanford distribution
+    parts = [parser_jar]
+    jar_dir = os.path.dirname(parser_jar)
+    if os.path.isdir(jar_dir):
+        for name in sorted(os.listdir(jar_dir)):
+            if name.endswith("-models.jar"):
+                parts.append(os.path.join(jar_dir, name))
+    return os.pathsep.join(parts)
+
+
+class ParserWorker:
+    """One resident JVM running LexicalizedParserServer on a localhost port."""
+
+    def __init__(self, parser_jar: str, model_path: str):
+        self.parser_jar = parser_jar
+        self.model_path = model_path
+        self.port = None
+        self.proc = None
+        self.restarts = 0
+        self.requests = 0
+        self.ping_failures = 0
+        self.last_used = time.monotonic()
+
+    def start(self):
+        java = shutil.which("java")
+        if java is None:
+            raise ParserUnavailable("java executable not found on PATH")
+        if not os.path.exists(self.parser_jar):
+            raise ParserUnavailable(f"stanford parser jar not found at {self.parser_jar}")
+        self.port = _free_port()
+        cmd = [java] + JAVA_OPTS + ["-cp", _build_classpath(self.parser_jar), SERVER_CLASS,
+                                    "-port", str(self.port), "-model", self.model_path]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # model loading takes a few seconds; wait until the port accepts connections
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise ParserUnavailable(f"parser server exited with code {self.proc.returncode}")
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                    self.last_used = time.monotonic()
+                    return
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise ParserUnavailable(f"parser server did not come up within {STARTUP_TIMEOUT}s")
+
+    def restart(self):
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def _request(self, command: str, timeout: float) -> str:
+        with socket.create_connection(("127.0.0.1", self.port), timeout=timeout) as s:
+            s.sendall((command + "\n").encode("utf-8"))
+            chunks = []
+            while True:
+                data = s.recv(65536)
+                if not data:
+                    break
+                chunks.append(data)
+        return b"".join(chunks).decode("utf-8").strip()
+
+    def parse(self, tokens: List[str]) -> str:
+        """
+        Parse one tokenized sentence; returns the penn-bracketed tree string.
+        ("parse" answers tree.toString(); "tree" would send a Java-serialized Tree.)
+        Raises ValueError if the reply isn't text.
+        """
+        # the server reads one line per request, so newlines must not leak in
+        sentence = " ".join(t.replace("\n", " ") for t in tokens)
+        out = self._request("parse " + sentence, REQUEST_TIMEOUT)
+        self.requests += 1
+        self.last_used = time.monotonic()
+        return out
+
+    def ping(self) -> bool:
+        """Does the server answer a one-word parse (not just: is the process running)?"""
+        if not self.alive():
+            return False
+        try:
+            ok = self._request("parse ok", 10).startswith("(")
+        except (OSError, ValueError):
+            ok = False
+        if ok:
+            self.last_used = time.monotonic()
+        else:
+            self.ping_failures += 1
+        return ok
+
+    def stop(self):
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            try:
+                self._request("quit", 2)
+            except OSError:
+                pass
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        self.proc = None
+
+
+class ParserPool:
+    """
+    Fixed-size pool of ParserWorkers. Each call checks out an idle worker,
+    restarts it if its JVM has died, and retries once on a socket failure.
+    """
+
+    def __init__(self, parser_jar: str, model_path: str, size: int = POOL_SIZE):
+        self.workers = [ParserWorker(parser_jar, model_path) for _ in range(max(1, size))]
+        self._idle = queue.Queue()
+        # fans parse_sents batches out over the workers
+        self._executor = ThreadPoolExecutor(max_workers=len(self.workers), thread_name_prefix="isl-parser")
+        try:
+            # model loading dominates start-up: bring the JVMs up side by side
+            for w in self._executor.map(self._start, self.workers):
+                self._idle.put(w)
+        except ParserUnavailable:
+            self.close()
+            raise
+
+    @staticmethod
+    def _start(worker: ParserWorker) -> ParserWorker:
+        worker.start()
+        return worker
+
+    def parse(self, tokens: List[str]) -> str:
+        worker = self._idle.get()
+        try:
+            if not worker.alive() or (time.monotonic() - worker.last_used > PING_AFTER_IDLE
+                                      and not worker.ping()):
+                worker.restart()
+            try:
+                return worker.parse(tokens)
+            except OSError:
+                # JVM crashed or hung mid-request: bring up a fresh one and retry once
+                worker.restart()
+                return worker.parse(tokens)
+        finally:
+            self._idle.put(worker)
+
+    def _parse_or_none(self, tokens: List[str]) -> Optional[str]:
+        try:
+            return self.parse(tokens)
+        except (ParserUnavailable, OSError, ValueError):
+            # ValueError: undecodable reply for this sentence; the others still parse
+            return None
+
+    def parse_sents(self, sentences: List[List[str]]) -> List[Optional[str]]:
+        """
+        Parse many tokenized sentences. The server takes one sentence per
+        request, so this is one round trip per sentence, run concurrently on
+        all workers; results come back in input order, with None for any
+        sentence that failed to parse.
+        """
+        if len(sentences) == 1:
+            return [self._parse_or_none(sentences[0])]
+        return list(self._executor.map(self._parse_or_none, sentences))
+
+    def health(self) -> Dict:
+        return {
+            "workers": len(self.workers),
+            "alive": sum(1 for w in self.workers if w.alive()),
+            "restarts": sum(w.restarts for w in self.workers),
+            "ping_failures": sum(w.ping_failures for w in self.workers),
+            "requests": sum(w.requests for w in self.workers),
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        for w in self.workers:
+            w.stop()
+
+
+# ---------------- process-wide singleton ----------------
+_pool: Optional[ParserPool] = None
+_pool_lock = threading.Lock()
+_last_failure = 0.0
+_last_error = None
+
+
+def get_parser_pool(parser_jar: str, model_path: str) -> ParserPool:
+    """
+    Return the shared ParserPool, starting it on first use.
+    Raises ParserUnavailable if the JVM can't be started (cached for RETRY_BACKOFF seconds).
+    """
+    global _pool, _last_failure, _last_error
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+        if _last_failure and time.monotonic() - _last_failure < RETRY_BACKOFF:
+            raise ParserUnavailable(_last_error)
+        try:
+            _pool = ParserPool(parser_jar, model_path)
+        except ParserUnavailable as e:
+            _last_failure = time.monotonic()
+            _last_error = str(e)
+            raise
+        return _pool
+
+
+def parser_health() -> Dict:
+    if _pool is None:
+        return {"started": False, "error": _last_error}
+    return dict(started=True, **_pool.health())
+
+
+def shutdown_parser_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+atexit.register(shutdown_parser_pool)
+
+if __name__ == "__main__":
+    # quick manual check: python isl_parser.py <stanford-parser.jar> <englishPCFG.ser.gz> words...
+    pool = get_parser_pool(sys.argv[1], sys.argv[2])
+    print(pool.parse(sys.argv[3:] or ["this", "is", "a", "test"]))
+    print(parser_health())
@@ -0,0 +1,195 @@
+# isl_sigml.py
+"""
+Merged SiGML documents for text_to_isl filename sequences.
+
+SigmlIndex parses every <name>.sigml in the sign folder once and keeps each
+file's sign elements (<hns_sign>, <hamgestural_sign>, ...) as pre-serialized
+XML fragments, keyed by lower-cased filename. A bundle for a sequence is
+then a string join - no file reads or XML parsing per request. The index
+reloads when the folder's mtime changes.
+
+SigmlBundler caches finished bundles by (index version, filename sequence)
+in a byte-bounded LRU, storing both the plain and the gzip-compressed body
+plus an ETag, so a repeated sentence costs one dict lookup and the avatar
+client gets the whole sentence in a single compressed response.
+
+Config (env):
+  ISL_SIGML_DIR          folder of per-sign .sigml files (default: sigml)
+  ISL_SIGML_CACHE_BYTES  bundle cache size, counting plain + gzip bytes (default 16 MiB)
+"""
+import os
+import gzip
+import time
+import hashlib
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from isl_vocab import CHECK_INTERVAL
+
+SIGML_DIR = os.environ.get("ISL_SIGML_DIR", "sigml")
+CACHE_BYTES = int(os.environ.get("ISL_SIGML_CACHE_BYTES", str(16 * 1024 * 1024)))
+GZIP_LEVEL = 6
+EXTENSION = ".sigml"
+
+HEADER = '<?xml version="1.0" encoding="utf-8"?>\n<sigml>\n'
+FOOTER = "</sigml>\n"
+
+
+def parse_fragments(path: str) -> List[str]:
+    """Sign elements of one .sigml file, serialized (the <sigml> wrapper is dropped)."""
+    root = ET.parse(path).getroot()
+    signs = list(root) if root.tag == "sigml" else [root]
+    out = []
+    for el in signs:
+        if not isinstance(el.tag, str):
+            continue  # comments / processing instructions
+        el.tail = None
+        out.append(ET.tostring(el, encoding="unicode"))
+    return out
+
+
+class SigmlIndex:
+    """filename (lower-cased, with .sigml) -> pre-serialized sign fragments."""
+
+    def __init__(self, folder: str = SIGML_DIR):
+        self.folder = folder
+        self.fragments: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.version = ""
+        self._mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    @property
+    def available(self) -> bool:
+        return self._mtime is not None
+
+    def load(self):
+        fragments, errors = {}, {}
+        h = hashlib.sha1()
+        try:
+            mtime = os.stat(self.folder).st_mtime
+            entries = sorted(os.scandir(self.folder), key=lambda e: e.name)
+        except FileNotFoundError:
+            mtime, entries = None, []
+        for entry in entries:
+            if not entry.name.lower().endswith(EXTENSION) or not entry.is_file():
+                continue
+            try:
+                signs = parse_fragments(entry.path)
+            except (ET.ParseError, OSError) as e:
+                errors[entry.name] = str(e)
+                continue
+            st = entry.stat()
+            h.update(f"{entry.name}|{st.st_size}|{st.st_mtime}\n".encode("utf-8"))
+            fragments[entry.name.lower()] = "\n".join(signs)
+        # swap in one assignment so readers never see a half-built index
+        self.fragments, self.errors, self.version = fragments, errors, h.hexdigest()[:12]
+        self._mtime = mtime
+        self._checked = time.monotonic()
+
+    def refresh(self) -> bool:
+        """Reload if files were added or removed (stat at most every ISL_VOCAB_CHECK_INTERVAL s)."""
+        now = time.monotonic()
+        if now - self._checked < CHECK_INTERVAL:
+            return False
+        with self._lock:
+            self._checked = now
+            try:
+                mtime = os.stat(self.folder).st_mtime
+            except FileNotFoundError:
+                mtime = None
+            if mtime == self._mtime:
+                return False
+            self.load()
+            return True
+
+    def __contains__(self, filename: str) -> bool:
+        return filename.lower() in self.fragments
+
+    def __len__(self) -> int:
+        return len(self.fragments)
+
+    def merge(self, filenames: List[str]) -> Tuple[str, List[str]]:
+        """One <sigml> document for the sequence, plus the filenames that have no sign."""
+        fragments = self.fragments
+        parts, missing = [], []
+        for name in filenames:
+            frag = fragments.get(name.lower())
+            if frag is None:
+                missing.append(name)
+            else:
+                parts.append(frag)
+        body = "\n".join(parts)
+        return HEADER + (body + "\n" if body else "") + FOOTER, missing
+
+
+class Bundle:
+    __slots__ = ("body", "gzipped", "etag", "missing")
+
+    def __init__(self, body: bytes, gzipped: bytes, etag: str, missing: List[str]):
+        self.body = body
+        self.gzipped = gzipped
+        self.etag = etag
+        self.missing = missing
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body) + len(self.gzipped)
+
+
+class SigmlBundler:
+    """Byte-bounded LRU of merged, pre-compressed bundles in front of a SigmlIndex."""
+
+    def __init__(self, index: SigmlIndex, max_bytes: int = CACHE_BYTES):
+        self.index = index
+        self.max_bytes = max_bytes
+        self._bundles: "OrderedDict[str, Bundle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, filenames: List[str]) -> Bundle:
+        self.index.refresh()
+        key = self.index.version + "\x1f" + "|".join(f.lower() for f in filenames)
+        with self._lock:
+            bundle = self._bundles.get(key)
+            if bundle is not None:
+                self._bundles.move_to_end(key)
+                self.hits += 1
+                return bundle
+        xml, missing = self.index.merge(filenames)
+        body = xml.encode("utf-8")
+        # mtime=0: identical bodies compress to identical bytes
+        bundle = Bundle(body, gzip.compress(body, GZIP_LEVEL, mtime=0),
+                        '"' + hashlib.sha1(body).hexdigest()[:20] + '"', missing)
+        with self._lock:
+            self.misses += 1
+            if key not in self._bundles and bundle.nbytes <= self.max_bytes:
+                self._bundles[key] = bundle
+                self.resident_bytes += bundle.nbytes
+                while self.resident_bytes > self.max_bytes:
+                    _, old = self._bundles.popitem(last=False)
+                    self.resident_bytes -= old.nbytes
+                    self.evictions += 1
+        return bundle
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "signs_indexed": len(self.index),
+            "parse_errors": len(self.index.errors),
+            "index_version": self.index.version,
+            "entries": len(self._bundles),
+            "bytes": self.resident_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
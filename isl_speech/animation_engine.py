@@ -1,66 +1,55 @@
 import speech_recognition as sr
-import whisper
-import spacy
-import torch
 import warnings
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from isl_asr import asr_config, get_asr_model
+from isl_audio import WHISPER_RATE
+from isl_vad import utterance_stream
+from gloss_engine import get_engine
 
 # --- IMPORT YOUR ANIMATION MODEL HERE ---
 # from animation_engine import generate_avatar_animation 
 # (Uncomment the line above if you have the file)
 
 # --- CONFIGURATION ---
-MODEL_TYPE = "small" # Fast and Accurate on GPU
+ASR = asr_config("openai-whisper")  # model/device from ISL_ASR_* or the hardware
 
 warnings.filterwarnings("ignore")
 
 def load_models():
-    print(f"⏳ Loading Whisper ({MODEL_TYPE}) on GPU...")
-    model = whisper.load_model(MODEL_TYPE, device="cuda")
-    nlp = spacy.load("en_core_web_sm")
+    print(f"⏳ Loading Whisper ({ASR['model']}) on {ASR['device'].upper()}...")
+    model = get_asr_model("openai-whisper")
+    # spoken-order keywords only: no parser needed
+    engine = get_engine("lexical")
     print("✅ Brain Ready!")
-    return model, nlp
+    return model, engine
 
-def text_to_isl(text, nlp):
-    doc = nlp(text)
-    isl_words = []
-    for token in doc:
-        word = token.lemma_.upper()
-        if token.is_stop and token.tag_ not in ["WDT", "WP", "WRB"] and token.dep_ != "neg":
-            continue
-        isl_words.append(word)
-    return isl_words
+def text_to_isl(text, engine):
+    # keywords in spoken order (no ISL reordering), stop words dropped
+    return engine.gloss(text, reorder=False)
 
 def main():
-    if not torch.cuda.is_available():
+    if ASR["device"] == "cpu":
         print("❌ GPU not found. Enabling CPU mode (Slower).")
 
-    model, nlp = load_models()
+    model, engine = load_models()
     
-    recognizer = sr.Recognizer()
-    recognizer.energy_threshold = 1000
-    recognizer.dynamic_energy_threshold = True
-    
-    with sr.Microphone() as source:
-        recognizer.adjust_for_ambient_noise(source, duration=1)
+    with sr.Microphone(sample_rate=WHISPER_RATE) as source:
         print("\n🎤 Conversation Started. Speak naturally...")
         
-        while True:
+        # 1. Listen: VAD (ISL_VAD) yields one utterance at a time, silence dropped
+        for samples in utterance_stream(lambda: source.stream.read(source.CHUNK)):
             try:
-                # 1. Listen
-                audio = recognizer.listen(source, timeout=None)
-                
-                # 2. Transcribe
-                with open("temp_live.wav", "wb") as f:
-                    f.write(audio.get_wav_data())
-                
-                result = model.transcribe("temp_live.wav", fp16=True)
+                # 2. Transcribe (in memory, no temp file)
+                result = model.transcribe(samples, fp16=ASR["fp16"])
                 english_text = result["text"].strip()
                 
                 if english_text:
                     print(f"📝 English: {english_text}")
                     
                     # 3. Convert to ISL
-                    isl_gloss_list = text_to_isl(english_text, nlp)
+                    isl_gloss_list = text_to_isl(english_text, engine)
                     print(f"📤 Sending to Model: {isl_gloss_list}")
                     
                     # --- 4. TRIGGER YOUR OTHER MODEL HERE ---
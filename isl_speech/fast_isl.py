@@ -1,161 +1,92 @@
-from faster_whisper import WhisperModel
-import spacy
-import torch
 import speech_recognition as sr
 import os
-import cv2
 import threading
 import queue
 import json
+import sys
+from gloss_engine import get_engine, gloss_worker
+from sign_assets import FrameCache, SignAssetIndex
+from sign_player import SignPlayer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from isl_asr import asr_config, get_asr_model
+from isl_audio import WHISPER_RATE
+from isl_vad import utterance_stream
 
 # --- CONFIGURATION ---
 VIDEO_FOLDER = r"D:\path\to\your\animations"  # CHANGE THIS
-MODEL_SIZE = "medium.en"  # Options: "small.en", "medium.en", "large-v3"
-COMPUTE_TYPE = "float16" if torch.cuda.is_available() else "int8"
-
-# --- SYNONYM MAP (Critical for ISL Accuracy) ---
-# Maps complex English words to simple files you actually have.
-SYNONYMS = {
-    "AUTOMOBILE": "CAR",
-    "VEHICLE": "CAR",
-    "RESIDENCE": "HOME",
-    "HOUSE": "HOME",
-    "PURCHASE": "BUY",
-    "OBTAIN": "GET",
-    "GREETINGS": "HELLO",
-    # Add more here based on your video library!
-}
+# Whisper model, device and compute type come from isl_asr (ISL_ASR_* env, "auto" by default)
+ASR = asr_config("faster-whisper")
 
-# Shared Queue
+# Shared Queues: transcripts -> gloss thread -> player
+text_queue = queue.Queue()
 animation_queue = queue.Queue()
 
 def load_models():
-    print(f"🚀 Loading Faster-Whisper ({MODEL_SIZE}) on GPU...")
+    print(f"🚀 Loading Faster-Whisper ({ASR['model']}) on {ASR['device'].upper()} ({ASR['compute_type']})...")
     
-    # Run on GPU with FP16 (Blazing fast)
-    model = WhisperModel(MODEL_SIZE, device="cuda", compute_type=COMPUTE_TYPE)
+    # FP16 on GPU, int8-quantized with capped threads on CPU
+    model = get_asr_model("faster-whisper")
     
     print("📚 Loading NLP...")
-    nlp = spacy.load("en_core_web_sm")
+    engine = get_engine()
     
     print("✅ Systems Optimized & Ready.")
-    return model, nlp
+    return model, engine
 
-def english_to_isl_gloss(text, nlp):
-    doc = nlp(text)
-    
-    # Buckets for SOV ordering
-    time_words = []
-    subject = []
-    obj = []
-    verb = []
-    negative = []
-    question = []
-    adjectives = []
-    
-    for token in doc:
-        # 1. Lemmatize & Upper: "Running" -> "RUN"
-        word = token.lemma_.upper()
-        
-        # 2. Synonym Check: "AUTOMOBILE" -> "CAR"
-        if word in SYNONYMS:
-            word = SYNONYMS[word]
+def on_gloss(text, isl_gloss):
+    print(f"🤟 ISL: {isl_gloss}")
+    for word in isl_gloss:
+        animation_queue.put(word)
 
-        # 3. Stop Word Filtering
-        if token.is_stop and token.tag_ not in ["WDT", "WP", "WRB"] and token.dep_ != "neg":
-            continue
-            
-        # 4. Grammar Bucketing
-        dep = token.dep_
-        pos = token.pos_
-        
-        if dep == "neg": 
-            negative.append("NOT") # Force standard "NOT"
-        elif token.tag_ in ["WDT", "WP", "WRB"]:
-            question.append(word)
-        elif "subj" in dep:
-            subject.append(word)
-        elif "obj" in dep:
-            obj.append(word)
-        elif pos == "VERB":
-            verb.append(word)
-        elif pos == "ADJ":
-            adjectives.append(word)
-        elif "time" in token.ent_type_ or pos == "ADV":
-            time_words.append(word)
-        else:
-            obj.append(word)
-
-    # ISL Structure: Time -> Subject -> Object -> Verb -> Negation -> Question
-    isl_sequence = time_words + subject + obj + verb + negative + question
-    return isl_sequence
-
-def listener_thread(model, nlp):
-    recognizer = sr.Recognizer()
-    recognizer.energy_threshold = 800 # Lower = more sensitive
-    
-    with sr.Microphone() as source:
-        recognizer.adjust_for_ambient_noise(source, duration=0.5)
+def listener_thread(model):
+    with sr.Microphone(sample_rate=WHISPER_RATE) as source:
         print("🎤 Listening (Optimized)...")
         
-        while True:
+        # VAD (ISL_VAD) cuts the mic stream into utterances; silence never reaches Whisper
+        for samples in utterance_stream(lambda: source.stream.read(source.CHUNK)):
             try:
-                # Wait for voice
-                audio_data = recognizer.listen(source, timeout=None)
                 print("⚡ Processing...")
 
-                # Write temp file
-                with open("temp_fast.wav", "wb") as f:
-                    f.write(audio_data.get_wav_data())
-
                 # --- FASTER-WHISPER INFERENCE ---
                 # This is where the magic happens. It returns segments.
-                segments, info = model.transcribe("temp_fast.wav", beam_size=5)
+                segments, info = model.transcribe(samples, beam_size=5)
                 
                 # Combine segments into one string
                 text = " ".join([segment.text for segment in segments]).strip()
                 
                 if text:
                     print(f"📝 Heard: {text}")
-                    isl_gloss = english_to_isl_gloss(text, nlp)
-                    print(f"🤟 ISL: {isl_gloss}")
-                    
-                    for word in isl_gloss:
-                        animation_queue.put(word)
+                    # glossed on the gloss thread, batched with anything still waiting
+                    text_queue.put(text)
                         
             except Exception as e:
                 print(f"❌ Error: {e}")
 
 def main():
     # 1. Init Models
-    if not torch.cuda.is_available():
-        print("⚠️ WARNING: GPU not found. This will be slow on CPU.")
+    if ASR["device"] == "cpu":
+        print(f"⚠️ GPU not found: running {ASR['model']} int8 on CPU ({ASR['cpu_threads']} threads).")
     
-    model, nlp = load_models()
+    model, engine = load_models()
 
-    # 2. Start Listener
-    threading.Thread(target=listener_thread, args=(model, nlp), daemon=True).start()
+    # 2. Start Listener + Gloss thread
+    threading.Thread(target=listener_thread, args=(model,), daemon=True).start()
+    threading.Thread(target=gloss_worker, args=(text_queue, on_gloss), kwargs={"engine": engine}, daemon=True).start()
 
     # 3. Video Player (Main Thread)
-    print("🎬 Display Active.")
-    while True:
-        if not animation_queue.empty():
-            word = animation_queue.get()
-            video_path = os.path.join(VIDEO_FOLDER, f"{word}.mp4")
-            
-            if os.path.exists(video_path):
-                cap = cv2.VideoCapture(video_path)
-                while cap.isOpened():
-                    ret, frame = cap.read()
-                    if not ret: break
-                    cv2.imshow('ISL Avatar', frame)
-                    if cv2.waitKey(25) & 0xFF == ord('q'): return
-                cap.release()
-            else:
-                # If word missing, try spelling it out? (Optional feature)
-                print(f"⚠️ Asset missing: {word}.mp4")
-        else:
-            cv2.waitKey(50)
+    # clip folder scanned once; decoded, downscaled frames of recent signs stay in RAM
+    assets = SignAssetIndex(VIDEO_FOLDER)
+    frame_cache = FrameCache(assets)
+    def on_missing(word):
+        print(f"⚠️ Asset missing: {word}")
+        assets.refresh()  # pick up clips added since startup for the next lookup
+
+    # decodes a few glosses ahead of the display, paces frames to a steady clock; 'q' quits
+    player = SignPlayer(frame_cache, glosses=animation_queue, on_missing=on_missing)
+    print(f"🎬 Display Active. {len(assets)} sign clips indexed.")
+    player.run()
+    print(f"📊 Playback: {player.stats()}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,225 @@
+# gloss_engine.py
+"""
+Shared English -> ISL gloss engine for the speech front-ends
+(fast_isl, realtime_isl, isl_translator, animation_engine).
+
+One spaCy model per process and gloss profile, loaded without the components
+the profile never reads, batched through nlp.pipe. Lemmas go through the
+SYNONYMS table; the words.txt vocabulary is kept as an upper-cased set for
+in_vocabulary() and reloaded when the file changes.
+
+gloss_doc holds the one set of gloss rules all front-ends share. Their own
+copies had drifted apart, so moving them here changed some output: fast_isl
+now emits adjectives, realtime_isl and isl_translator emit NOT instead of the
+negation word's lemma, and SYNONYMS apply in every front-end.
+"""
+import os
+import sys
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from isl_vocab import get_vocabulary
+
+SPACY_MODEL = os.environ.get("ISL_SPACY_MODEL", "en_core_web_sm")
+WORDS_FILE = os.environ.get("ISL_WORDS_FILE", os.path.join(ROOT, "words.txt"))
+GLOSS_PROFILE = os.environ.get("ISL_GLOSS_PROFILE", "gloss")
+BATCH_SIZE = int(os.environ.get("ISL_GLOSS_BATCH", "32"))
+# nlp.pipe fans out to N_PROCESS workers once BACKLOG utterances are waiting
+N_PROCESS = int(os.environ.get("ISL_GLOSS_PROCESSES", "2"))
+BACKLOG = int(os.environ.get("ISL_GLOSS_BACKLOG", "64"))
+
+# Components each profile leaves out of spacy.load (excluded, not just disabled).
+#   full    - the whole model (reference / debugging)
+#   gloss   - reordered glosses: tagger, attribute_ruler, lemmatizer, parser.
+#             The rules also tested `"time" in token.ent_type_`, which never
+#             matched (spaCy labels are upper-case), so NER goes.
+#   lexical - spoken-order keywords: no parser; negation is found by word and,
+#             if reordering is asked for anyway, subjects and objects share one
+#             noun bucket in sentence order.
+GLOSS_PROFILES = {
+    "full": [],
+    "gloss": ["ner"],
+    "lexical": ["ner", "parser"],
+}
+
+# --- SYNONYM MAP (Critical for ISL Accuracy) ---
+# Maps complex English words to simple files you actually have.
+SYNONYMS = {
+    "AUTOMOBILE": "CAR",
+    "VEHICLE": "CAR",
+    "RESIDENCE": "HOME",
+    "HOUSE": "HOME",
+    "PURCHASE": "BUY",
+    "OBTAIN": "GET",
+    "GREETINGS": "HELLO",
+    # Add more here based on your video library!
+}
+
+QUESTION_TAGS = {"WDT", "WP", "WP$", "WRB"}
+NEGATION_WORDS = {"not", "n't", "never"}
+
+
+class GlossEngine:
+    def __init__(self, model: str = SPACY_MODEL, words_file: str = WORDS_FILE,
+                 synonyms: Dict[str, str] = None, profile: str = GLOSS_PROFILE):
+        if profile not in GLOSS_PROFILES:
+            raise ValueError(f"unknown gloss profile {profile!r} (expected one of {sorted(GLOSS_PROFILES)})")
+        import spacy
+        self.profile = profile
+        self.nlp = spacy.load(model, exclude=GLOSS_PROFILES[profile])
+        self.has_parser = "parser" in self.nlp.pipe_names
+        self.words_file = words_file
+        self.synonyms = SYNONYMS if synonyms is None else synonyms
+        self._vocab_version = None
+        self.vocabulary = frozenset()
+        self.load_vocabulary()
+
+    def load_vocabulary(self):
+        """Upper-cased words.txt entries (empty if the file is missing)."""
+        try:
+            vocab = get_vocabulary(self.words_file)
+        except FileNotFoundError:
+            self.vocabulary, self._vocab_version = frozenset(), None
+            return
+        self.vocabulary = frozenset(w.upper() for w in vocab.words)
+        self._vocab_version = vocab.version
+
+    def in_vocabulary(self, gloss: str) -> bool:
+        return gloss in self.vocabulary
+
+    def _refresh(self):
+        try:
+            version = get_vocabulary(self.words_file).version
+        except FileNotFoundError:
+            version = None
+        if version != self._vocab_version:
+            self.load_vocabulary()
+
+    def _is_negation(self, token) -> bool:
+        if self.has_parser:
+            return token.dep_ == "neg"
+        return token.lower_ in NEGATION_WORDS
+
+    def gloss_doc(self, doc, reorder: bool = True) -> List[str]:
+        synonyms = self.synonyms
+        # Buckets for SOV ordering
+        time_words, subject, adjectives, obj, verb, negative, question = [], [], [], [], [], [], []
+        plain = []
+
+        for token in doc:
+            # 1. Lemmatize & Upper: "Running" -> "RUN"; 2. Synonym Check: "AUTOMOBILE" -> "CAR"
+            word = token.lemma_.upper()
+            word = synonyms.get(word, word)
+
+            # 3. Stop Word Filtering (keep question words and negation)
+            negation = self._is_negation(token)
+            if token.is_stop and token.tag_ not in QUESTION_TAGS and not negation:
+                continue
+            if not reorder:
+                plain.append(word)
+                continue
+
+            # 4. Grammar Bucketing
+            dep = token.dep_
+            pos = token.pos_
+            if negation:
+                negative.append("NOT")  # Force standard "NOT"
+            elif token.tag_ in QUESTION_TAGS:
+                question.append(word)
+            elif "subj" in dep:
+                subject.append(word)
+            elif "obj" in dep:
+                obj.append(word)
+            elif pos == "VERB":
+                verb.append(word)
+            elif pos == "ADJ":
+                adjectives.append(word)
+            elif pos == "ADV":
+                time_words.append(word)
+            else:
+                obj.append(word)
+
+        if not reorder:
+            return plain
+        # ISL Structure: Time -> Subject -> Adjectives -> Object -> Verb -> Negation -> Question
+        isl_sequence = time_words + subject + adjectives + obj + verb + negative + question
+        if not isl_sequence:
+            isl_sequence = [synonyms.get(t.lemma_.upper(), t.lemma_.upper()) for t in doc if not t.is_stop]
+        return isl_sequence
+
+    def gloss(self, text: str, reorder: bool = True) -> List[str]:
+        self._refresh()
+        return self.gloss_doc(self.nlp(text), reorder=reorder)
+
+    def gloss_stream(self, texts: Iterable[str], reorder: bool = True,
+                     batch_size: int = BATCH_SIZE, n_process: int = 1) -> Iterator[List[str]]:
+        """Yield one gloss per text, streaming through nlp.pipe."""
+        self._refresh()
+        for doc in self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+            yield self.gloss_doc(doc, reorder=reorder)
+
+    def gloss_many(self, texts: Iterable[str], reorder: bool = True,
+                   batch_size: int = BATCH_SIZE) -> List[List[str]]:
+        """
+        Gloss several utterances in one nlp.pipe pass. Backlogs of BACKLOG or
+        more texts are spread over N_PROCESS worker processes.
+        """
+        texts = list(texts)
+        n_process = N_PROCESS if N_PROCESS > 1 and len(texts) >= BACKLOG else 1
+        return list(self.gloss_stream(texts, reorder=reorder, batch_size=batch_size, n_process=n_process))
+
+
+# ---------------- process-wide engines ----------------
+_engines: Dict[str, GlossEngine] = {}
+_engine_lock = threading.Lock()
+
+
+def get_engine(profile: str = None) -> GlossEngine:
+    """Shared GlossEngine for `profile` (spaCy loaded once per process and profile)."""
+    profile = profile or GLOSS_PROFILE
+    engine = _engines.get(profile)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(profile)
+            if engine is None:
+                engine = _engines[profile] = GlossEngine(profile=profile)
+    return engine
+
+
+def text_to_isl_gloss(text: str) -> List[str]:
+    return get_engine().gloss(text)
+
+
+# ---------------- queue consumer ----------------
+def drain(q: queue.Queue, max_items: int = BACKLOG * 4) -> List[str]:
+    """Block for one item, then take whatever else is already waiting."""
+    items = [q.get()]
+    while len(items) < max_items:
+        try:
+            items.append(q.get_nowait())
+        except queue.Empty:
+            break
+    return items
+
+
+def gloss_worker(text_queue: queue.Queue, on_gloss: Callable[[str, List[str]], None],
+                 reorder: bool = True, engine: GlossEngine = None):
+    """
+    Gloss utterances from `text_queue` forever. Everything that piled up while
+    the previous batch ran is glossed together; `on_gloss(text, gloss)` is
+    called in arrival order.
+    """
+    engine = engine or get_engine()
+    while True:
+        texts = drain(text_queue)
+        try:
+            glosses = engine.gloss_many(texts, reorder=reorder)
+        except Exception as e:
+            print(f"❌ Gloss error: {e}")
+            continue
+        for text, gloss in zip(texts, glosses):
+            on_gloss(text, gloss)
@@ -1,93 +1,49 @@
 import speech_recognition as sr
-import whisper
-import spacy
 import torch
 import warnings
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from isl_asr import asr_config, get_asr_model
+from isl_audio import WHISPER_RATE
+from isl_vad import Segmenter, utterance_stream
+from gloss_engine import get_engine
 
 # Filter warnings
 warnings.filterwarnings("ignore")
 
-# Check for GPU
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# Check for GPU (model size and threads follow from it, see isl_asr)
+ASR = asr_config("openai-whisper")
+DEVICE = ASR["device"]
 print(f"🚀 Hardware Detected: {DEVICE.upper()}")
 if DEVICE == "cuda":
     print(f"   GPU Name: {torch.cuda.get_device_name(0)}")
 
-print("⏳ Loading Whisper Model on GPU...")
-# 'base' is fast, but on GPU you might even be able to use 'small' or 'medium' for better accuracy!
-audio_model = whisper.load_model("base", device=DEVICE)
+print(f"⏳ Loading Whisper Model ({ASR['model']}) on {DEVICE.upper()}...")
+audio_model = get_asr_model("openai-whisper")
 print("✅ Whisper Loaded!")
 
 print("⏳ Loading NLP Model...")
-nlp = spacy.load("en_core_web_sm")
+gloss_engine = get_engine()
 print("✅ NLP Loaded!")
 
 def text_to_isl_gloss(text):
-    doc = nlp(text)
-    
-    # Buckets for reordering
-    time_words = []
-    subject = []
-    obj = []
-    verb = []
-    negative = []
-    question = []
-    adjectives = []
-    
-    for token in doc:
-        word = token.lemma_.upper()
-        
-        if token.is_stop and token.tag_ not in ["WDT", "WP", "WP$", "WRB"] and token.dep_ != "neg":
-            continue
-            
-        dep = token.dep_
-        pos = token.pos_
-        
-        if dep == "neg":
-            negative.append(word)
-        elif token.tag_ in ["WDT", "WP", "WP$", "WRB"]:
-            question.append(word)
-        elif "subj" in dep:
-            subject.append(word)
-        elif "obj" in dep:
-            obj.append(word)
-        elif pos == "VERB":
-            verb.append(word)
-        elif pos == "ADJ":
-            adjectives.append(word)
-        elif "time" in token.ent_type_ or pos == "ADV":
-            time_words.append(word)
-        else:
-            obj.append(word)
-
-    isl_sequence = time_words + subject + adjectives + obj + verb + negative + question
-    if not isl_sequence:
-        isl_sequence = [t.lemma_.upper() for t in doc if not t.is_stop]
-    return isl_sequence
+    return gloss_engine.gloss(text)
 
 def main():
-    recognizer = sr.Recognizer()
-    recognizer.energy_threshold = 1000
-    recognizer.dynamic_energy_threshold = True
-
     print("\n🎧 --- REAL-TIME ISL (GPU POWERED) ---")
 
-    with sr.Microphone() as source:
-        recognizer.adjust_for_ambient_noise(source, duration=1)
+    with sr.Microphone(sample_rate=WHISPER_RATE) as source:
+        print("\n🎤 Listening...")
+        # VAD (ISL_VAD) closes an utterance on silence, or after 10 s of speech
+        utterances = utterance_stream(lambda: source.stream.read(source.CHUNK), Segmenter(max_utterance_s=10))
         
-        while True:
+        for samples in utterances:
             try:
-                print("\n🎤 Listening...")
-                audio_data = recognizer.listen(source, timeout=5, phrase_time_limit=10)
-                
                 print("⚡ Processing on GPU...")
                 
-                # Save temp file
-                with open("temp_audio.wav", "wb") as f:
-                    f.write(audio_data.get_wav_data())
-                
-                # Transcribe (FP16 is faster on GPU)
-                result = audio_model.transcribe("temp_audio.wav", fp16=True)
+                # Transcribe from memory (FP16 on GPU only)
+                result = audio_model.transcribe(samples, fp16=ASR["fp16"])
                 english_text = result["text"].strip()
                 
                 if english_text:
@@ -95,8 +51,7 @@ def main():
                     isl_gloss = text_to_isl_gloss(english_text)
                     print(f"👋 ISL Output: {isl_gloss}")
                     
-            except sr.WaitTimeoutError:
-                pass
+                print("\n🎤 Listening...")
             except Exception as e:
                 print(f"Error: {e}")
 
@@ -0,0 +1,197 @@
+# sign_assets.py
+"""
+Sign clip lookup and decoded-frame cache for the players.
+
+SignAssetIndex scans the clip folder once (one os.scandir, no per-word
+os.path.exists) and maps GLOSS -> clip metadata. FrameCache keeps decoded,
+downscaled frames of recently played clips in a byte-bounded LRU, so
+frequent signs (HELLO, NOT, ...) replay from RAM without touching the codec.
+
+Config (env):
+  ISL_SIGN_CACHE_MB    decoded-frame budget (default 256)
+  ISL_SIGN_MAX_WIDTH   frames wider than this are downscaled (0 = keep size)
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+CLIP_EXTENSIONS = (".mp4", ".webm", ".mov", ".avi", ".mkv")
+CACHE_BYTES = int(float(os.environ.get("ISL_SIGN_CACHE_MB", "256")) * 1024 * 1024)
+MAX_WIDTH = int(os.environ.get("ISL_SIGN_MAX_WIDTH", "360"))
+
+
+class ClipInfo:
+    __slots__ = ("gloss", "path", "size", "mtime")
+
+    def __init__(self, gloss: str, path: str, size: int, mtime: float):
+        self.gloss = gloss
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+
+class SignAssetIndex:
+    """GLOSS -> ClipInfo for every clip in `folder` (file stem, upper-cased)."""
+
+    def __init__(self, folder: str, extensions=CLIP_EXTENSIONS):
+        self.folder = folder
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.clips: Dict[str, ClipInfo] = {}
+        self._mtime = None
+        self.scan()
+
+    def scan(self):
+        clips = {}
+        try:
+            self._mtime = os.stat(self.folder).st_mtime
+            entries = list(os.scandir(self.folder))
+        except FileNotFoundError:
+            self._mtime = None
+            entries = []
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() not in self.extensions or not entry.is_file():
+                continue
+            gloss = stem.upper()
+            # prefer the first extension in CLIP_EXTENSIONS when a sign has several files
+            if gloss in clips and self.extensions.index(ext.lower()) >= \
+                    self.extensions.index(os.path.splitext(clips[gloss].path)[1].lower()):
+                continue
+            st = entry.stat()
+            clips[gloss] = ClipInfo(gloss, entry.path, st.st_size, st.st_mtime)
+        self.clips = clips
+
+    def refresh(self) -> bool:
+        """Rescan if files were added or removed (folder mtime changed)."""
+        try:
+            mtime = os.stat(self.folder).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+        self.scan()
+        return True
+
+    def lookup(self, gloss: str) -> Optional[ClipInfo]:
+        return self.clips.get(gloss.upper())
+
+    def __contains__(self, gloss: str) -> bool:
+        return gloss.upper() in self.clips
+
+    def __len__(self) -> int:
+        return len(self.clips)
+
+
+class Clip:
+    """Decoded frames of one sign (uint8 BGR, shape n x h x w x 3)."""
+    __slots__ = ("gloss", "frames", "fps")
+
+    def __init__(self, gloss: str, frames: np.ndarray, fps: float):
+        self.gloss = gloss
+        self.frames = frames
+        self.fps = fps
+
+    @property
+    def nbytes(self) -> int:
+        return self.frames.nbytes
+
+
+def decode_clip(info: ClipInfo, max_width: int = MAX_WIDTH) -> Optional[Clip]:
+    import cv2
+    cap = cv2.VideoCapture(info.path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    frames: List[np.ndarray] = []
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            h, w = frame.shape[:2]
+            if max_width and w > max_width:
+                frame = cv2.resize(frame, (max_width, max(1, round(h * max_width / w))),
+                                   interpolation=cv2.INTER_AREA)
+            frames.append(frame)
+    finally:
+        cap.release()
+    if not frames:
+        return None
+    return Clip(info.gloss, np.stack(frames), fps)
+
+
+class FrameCache:
+    """
+    Byte-bounded LRU of decoded clips. get() decodes on a miss; clips larger
+    than the whole budget are returned but not kept.
+    """
+
+    def __init__(self, index: SignAssetIndex, max_bytes: int = CACHE_BYTES, max_width: int = MAX_WIDTH):
+        self.index = index
+        self.max_bytes = max_bytes
+        self.max_width = max_width
+        self._clips: "OrderedDict[str, Clip]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.decode_s = 0.0
+
+    def get(self, gloss: str) -> Optional[Clip]:
+        key = gloss.upper()
+        with self._lock:
+            clip = self._clips.get(key)
+            if clip is not None:
+                self._clips.move_to_end(key)
+                self.hits += 1
+                return clip
+        info = self.index.lookup(key)
+        if info is None:
+            return None
+        t0 = time.perf_counter()
+        clip = decode_clip(info, self.max_width)
+        with self._lock:
+            self.misses += 1
+            self.decode_s += time.perf_counter() - t0
+            if clip is not None and key not in self._clips:
+                self._put(key, clip)
+        return clip
+
+    def _put(self, key: str, clip: Clip):
+        if clip.nbytes > self.max_bytes:
+            return
+        self._clips[key] = clip
+        self.resident_bytes += clip.nbytes
+        while self.resident_bytes > self.max_bytes:
+            _, old = self._clips.popitem(last=False)
+            self.resident_bytes -= old.nbytes
+            self.evictions += 1
+
+    def __contains__(self, gloss: str) -> bool:
+        return gloss.upper() in self._clips
+
+    def clear(self):
+        with self._lock:
+            self._clips.clear()
+            self.resident_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "clips_indexed": len(self.index),
+            "entries": len(self._clips),
+            "resident_mb": round(self.resident_bytes / (1024 * 1024), 1),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "decode_ms_total": round(self.decode_s * 1000.0, 1),
+        }
@@ -0,0 +1,157 @@
+# sign_player.py
+"""
+Gap-free sign playback for the OpenCV players.
+
+A prefetch thread takes glosses off the input queue and decodes them (via
+FrameCache, so repeated signs cost nothing) up to LOOKAHEAD clips ahead of
+the display. The display loop, which must own the cv2 window (main thread),
+paces frames to a steady clock: each frame has a deadline, the first frame
+of the next clip is due one period after the last frame of the previous
+one, and frames that are already a full period late are dropped to catch
+up. Waiting is done inside cv2.waitKey, so the loop never busy-polls.
+
+Config (env):
+  ISL_SIGN_LOOKAHEAD   decoded clips buffered ahead of the display (default 3)
+  ISL_SIGN_FPS         playback rate; 0 = each clip's own frame rate (default 0)
+"""
+import os
+import time
+import queue
+import threading
+from typing import Callable, Optional
+
+from sign_assets import FrameCache
+
+LOOKAHEAD = int(os.environ.get("ISL_SIGN_LOOKAHEAD", "3"))
+PLAYBACK_FPS = float(os.environ.get("ISL_SIGN_FPS", "0"))
+DEFAULT_FPS = 25.0
+IDLE_WAIT_MS = 100  # window event pump while nothing is queued
+WINDOW = "ISL Avatar"
+
+
+class SignPlayer:
+    def __init__(self, frame_cache: FrameCache, glosses: queue.Queue = None, lookahead: int = LOOKAHEAD,
+                 fps: float = PLAYBACK_FPS, show: Callable = None, wait_key: Callable = None,
+                 on_missing: Callable[[str], None] = None):
+        self.cache = frame_cache
+        self.glosses = glosses if glosses is not None else queue.Queue()
+        self.clips: queue.Queue = queue.Queue(maxsize=max(1, lookahead))
+        self.fps = fps
+        if show is None or wait_key is None:
+            import cv2
+            show = show or (lambda frame: cv2.imshow(WINDOW, frame))
+            wait_key = wait_key or cv2.waitKey
+        self.show = show
+        self.wait_key = wait_key
+        self.on_missing = on_missing or (lambda word: print(f"⚠️ Asset missing: {word}"))
+        self._stop = threading.Event()
+        self.frames_shown = 0
+        self.frames_dropped = 0
+        self.clips_played = 0
+        self.missing = 0
+        self.underruns = 0
+        self.gap_ms_total = 0.0
+        self.gap_ms_max = 0.0
+        self.late_ms_max = 0.0
+        self._prefetcher = threading.Thread(target=self._prefetch, daemon=True)
+        self._prefetcher.start()
+
+    def enqueue(self, gloss: str):
+        self.glosses.put(gloss)
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------- prefetch (background thread) ----------
+    def _prefetch(self):
+        while not self._stop.is_set():
+            word = self.glosses.get()
+            try:
+                clip = self.cache.get(word)
+                if clip is None:
+                    self.missing += 1
+                    self.on_missing(word)
+                else:
+                    self.clips.put(clip)  # blocks once LOOKAHEAD clips are waiting
+            finally:
+                self.glosses.task_done()
+
+    def _backlogged(self) -> bool:
+        # glosses queued or still being decoded (task_done not called yet)
+        return self.glosses.unfinished_tasks > 0
+
+    # ---------- display (caller's thread, owns the window) ----------
+    def run(self, quit_key: str = "q"):
+        """Play until `quit_key` is pressed or stop() is called."""
+        quit_code = ord(quit_key)
+        deadline = None  # when the next frame is due; None = idle, restart the clock
+        while not self._stop.is_set():
+            try:
+                clip = self.clips.get_nowait()
+            except queue.Empty:
+                if deadline is not None and self._backlogged():
+                    # a sign is on its way but not decoded yet: this is a visible gap
+                    self.underruns += 1
+                    started = time.perf_counter()
+                    clip = self._wait_for_clip(quit_code)
+                    if clip is None:
+                        return
+                    gap_ms = (time.perf_counter() - started) * 1000.0
+                    self.gap_ms_total += gap_ms
+                    self.gap_ms_max = max(self.gap_ms_max, gap_ms)
+                    deadline = None  # the gap is already counted; don't drop frames to "catch up"
+                else:
+                    deadline = None
+                    clip = self._wait_for_clip(quit_code)
+                    if clip is None:
+                        return
+            if deadline is None:
+                deadline = time.perf_counter()
+            deadline = self._play(clip, deadline, quit_code)
+            if deadline is None:
+                return
+            self.clips_played += 1
+
+    def _wait_for_clip(self, quit_code: int):
+        while not self._stop.is_set():
+            try:
+                return self.clips.get(timeout=IDLE_WAIT_MS / 1000.0)
+            except queue.Empty:
+                if self.wait_key(1) & 0xFF == quit_code:
+                    return None
+        return None
+
+    def _play(self, clip, deadline: float, quit_code: int) -> Optional[float]:
+        period = 1.0 / (self.fps or clip.fps or DEFAULT_FPS)
+        last = len(clip.frames) - 1
+        for i, frame in enumerate(clip.frames):
+            late = time.perf_counter() - deadline
+            if late >= period and i < last:
+                # a full frame behind: skip to catch up (the clip's last frame is always shown)
+                self.frames_dropped += 1
+                deadline += period
+                continue
+            self.late_ms_max = max(self.late_ms_max, late * 1000.0)
+            self.show(frame)
+            self.frames_shown += 1
+            deadline += period
+            # wait for the next deadline inside waitKey (also pumps window events)
+            wait_ms = max(1, int((deadline - time.perf_counter()) * 1000.0))
+            if self.wait_key(wait_ms) & 0xFF == quit_code:
+                return None
+        return deadline
+
+    def stats(self):
+        total = self.frames_shown + self.frames_dropped
+        return {
+            "clips_played": self.clips_played,
+            "missing": self.missing,
+            "frames_shown": self.frames_shown,
+            "frames_dropped": self.frames_dropped,
+            "drop_rate": round(self.frames_dropped / total, 4) if total else 0.0,
+            "underruns": self.underruns,
+            "gap_ms_mean": round(self.gap_ms_total / self.underruns, 1) if self.underruns else 0.0,
+            "gap_ms_max": round(self.gap_ms_max, 1),
+            "late_ms_max": round(self.late_ms_max, 1),
+            "cache": self.cache.stats(),
+        }
@@ -0,0 +1,210 @@
+# sign_stitcher.py
+"""
+Stitched sign-sequence clips for clients that play one video per utterance.
+
+StitchCache.stitch(glosses) joins the clips of a gloss sequence into one MP4
+(ffmpeg concat demuxer, re-encoded to one width / frame rate so clips from
+different sources join cleanly; +faststart so a player can start and seek
+over HTTP ranges before the whole file has arrived).
+
+Results live in a content-addressed folder: the key hashes the clip files in
+order (name, size, mtime) plus the render settings, so a repeated phrase is
+a file lookup and a replaced clip gets a new key. The folder is an LRU
+bounded by bytes; last use is the file mtime, so the order survives
+restarts. Concurrent requests for the same sequence wait for one render.
+
+Config (env):
+  ISL_FFMPEG             ffmpeg binary (default: ffmpeg)
+  ISL_STITCH_CACHE_DIR   cache folder (default: <repo>/.cache/stitched)
+  ISL_STITCH_CACHE_MB    size limit (default 512)
+  ISL_STITCH_WIDTH       output width, height keeps the aspect ratio (default 480)
+  ISL_STITCH_FPS         output frame rate (default 25)
+"""
+import os
+import re
+import time
+import hashlib
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from sign_assets import ClipInfo, SignAssetIndex
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+FFMPEG = os.environ.get("ISL_FFMPEG", "ffmpeg")
+CACHE_DIR = os.environ.get("ISL_STITCH_CACHE_DIR", os.path.join(ROOT, ".cache", "stitched"))
+CACHE_BYTES = int(float(os.environ.get("ISL_STITCH_CACHE_MB", "512")) * 1024 * 1024)
+WIDTH = int(os.environ.get("ISL_STITCH_WIDTH", "480"))
+FPS = int(os.environ.get("ISL_STITCH_FPS", "25"))
+RENDER_TIMEOUT_S = 60.0
+EXTENSION = ".mp4"
+KEY_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def sequence_key(clips: List[ClipInfo], width: int = WIDTH, fps: int = FPS) -> str:
+    """Content address of a stitched clip: the source files in order + render settings."""
+    h = hashlib.sha256(f"v1|{width}|{fps}".encode())
+    for info in clips:
+        h.update(f"\x1f{info.filename}|{info.size}|{info.mtime:.6f}".encode())
+    return h.hexdigest()[:32]
+
+
+class StitchCache:
+    def __init__(self, index: SignAssetIndex, folder: str = CACHE_DIR, max_bytes: int = CACHE_BYTES,
+                 ffmpeg: str = FFMPEG, width: int = WIDTH, fps: int = FPS):
+        self.index = index
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.ffmpeg = ffmpeg
+        self.width = width
+        self.fps = fps
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> bytes, oldest use first
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.renders = 0
+        self.failures = 0
+        self.evictions = 0
+        self.render_s = 0.0
+        os.makedirs(folder, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        found = []
+        for entry in os.scandir(self.folder):
+            key, ext = os.path.splitext(entry.name)
+            if ext == EXTENSION and KEY_RE.match(key) and entry.is_file():
+                st = entry.stat()
+                found.append((st.st_mtime, key, st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.resident_bytes += size
+        with self._lock:
+            self._evict()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.folder, key + EXTENSION)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Path of a cached clip (and mark it used), or None."""
+        if not KEY_RE.match(key):
+            return None
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._touch(key)
+        return self.path(key)
+
+    def _touch(self, key: str):
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            pass
+
+    def stitch(self, glosses: List[str]) -> Optional[str]:
+        """
+        Key of the stitched clip for the glosses that have a clip (rendered on
+        the first request), or None when fewer than two do. Raises RuntimeError
+        if ffmpeg fails.
+        """
+        clips = [info for info in (self.index.lookup(g) for g in glosses) if info is not None]
+        if len(clips) < 2:
+            return None
+        key = sequence_key(clips, self.width, self.fps)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._touch(key)
+                return key
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+        if not owner:
+            # same sequence is being rendered for another session
+            event.wait(RENDER_TIMEOUT_S)
+            with self._lock:
+                if key in self._entries:
+                    self.hits += 1
+                    return key
+            raise RuntimeError(f"stitch {key} failed in another request")
+        try:
+            t0 = time.perf_counter()
+            size = self._render(clips, self.path(key))
+            with self._lock:
+                self.renders += 1
+                self.render_s += time.perf_counter() - t0
+                self._entries[key] = size
+                self.resident_bytes += size
+                self._evict(keep=key)
+            return key
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def _render(self, clips: List[ClipInfo], out: str) -> int:
+        fd, list_path = tempfile.mkstemp(suffix=".txt", dir=self.folder)
+        tmp_out = out + ".part"
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for info in clips:
+                    path = os.path.abspath(info.path).replace("'", "'\\''")
+                    f.write(f"file '{path}'\n")
+            cmd = [self.ffmpeg, "-nostdin", "-loglevel", "error", "-y",
+                   "-f", "concat", "-safe", "0", "-i", list_path,
+                   "-vf", f"scale={self.width}:-2,setsar=1,fps={self.fps},format=yuv420p",
+                   "-an", "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+                   "-movflags", "+faststart", "-f", "mp4", tmp_out]
+            try:
+                proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                      timeout=RENDER_TIMEOUT_S)
+            except subprocess.TimeoutExpired:
+                raise RuntimeError(f"ffmpeg timed out after {RENDER_TIMEOUT_S:.0f}s")
+            if proc.returncode != 0 or not os.path.exists(tmp_out):
+                err = proc.stderr.decode("utf-8", "replace").strip().splitlines()[-1:] or ["no output"]
+                raise RuntimeError(f"ffmpeg exited {proc.returncode}: {err[0]}")
+            os.replace(tmp_out, out)  # readers never see a half-written clip
+            return os.path.getsize(out)
+        finally:
+            for p in (list_path, tmp_out):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+
+    def _evict(self, keep: str = None):
+        # caller holds the lock
+        while self.resident_bytes > self.max_bytes and self._entries:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self.resident_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass  # still open for a download (Windows); oldest on disk, so the next _load() evicts it
+
+    def stats(self):
+        lookups = self.hits + self.renders
+        return {
+            "entries": len(self._entries),
+            "resident_mb": round(self.resident_bytes / (1024 * 1024), 1),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 1),
+            "hits": self.hits,
+            "renders": self.renders,
+            "failures": self.failures,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "render_ms_mean": round(self.render_s * 1000.0 / self.renders, 1) if self.renders else 0.0,
+        }
@@ -2,23 +2,20 @@
 import os
 import sys
 import time
-import zipfile
-import pprint
-import ssl
 import re
+import threading
 from typing import List, Tuple, Dict
 
-# stanza for tokenization/lemmatization
-import stanza
-stanza.download('en', model_dir='stanza_resources', verbose=False)
-en_nlp = stanza.Pipeline('en', processors={'tokenize': 'spacy'}, verbose=False)
+# stanza and nltk are heavy to import; they are loaded lazily (see get_pipeline / nltk tree uses)
+# so that `import isl_tokenizer` stays cheap for every worker, rerun and CLI call. The same goes
+# for ssl / zipfile (downloads only) and isl_parser (sockets, subprocesses; see get_parser).
+from isl_vocab import get_vocabulary
+from isl_cache import LRUCache
 
-# NLTK / Stanford Parser
-from nltk.parse.stanford import StanfordParser
-from nltk.tree import ParentedTree
-
-# glue to make TLS downloads work in some envs
-ssl._create_default_https_context = ssl._create_unverified_context
+def _allow_unverified_tls():
+    # glue to make TLS downloads work in some envs (applied right before downloading)
+    import ssl
+    ssl._create_default_https_context = ssl._create_unverified_context
 
 # default base dir (folder containing this file)
 BASE_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -30,6 +27,9 @@ os.environ.setdefault('STANFORD_PARSER', os.path.join(stanford_dir, 'stanford-pa
 os.environ.setdefault('STANFORD_MODELS', os.path.join(stanford_dir,
                                                      'edu/stanford/nlp/models/lexparser/englishPCFG.ser.gz'))
 
+# where stanza models live (downloaded here once if missing)
+STANZA_DIR = os.environ.get('STANZA_RESOURCES_DIR', 'stanza_resources')
+
 # Stop words to remove (same as your list)
 STOP_WORDS = set([
     "am","are","is","was","were","be","being","been",
@@ -57,6 +57,7 @@ def reporthook(count, block_size, total_size):
 
 def download_parser_jar_file():
     from six.moves import urllib
+    _allow_unverified_tls()
     stanford_parser_zip_file_path = os.environ.get('CLASSPATH') + ".jar"
     url = "https://nlp.stanford.edu/software/stanford-parser-full-2018-10-17.zip"
     print("Downloading Stanford parser zip (this can be large)...")
@@ -67,6 +68,7 @@ def extract_parser_jar_file():
     stanford_parser_zip_file_path = os.environ.get('CLASSPATH') + ".jar"
     if not os.path.exists(stanford_parser_zip_file_path):
         raise FileNotFoundError(f"Stanford parser zip not found at {stanford_parser_zip_file_path}")
+    import zipfile
     print("Extracting Stanford parser zip...")
     with zipfile.ZipFile(stanford_parser_zip_file_path) as z:
         z.extractall(path=BASE_DIR)
@@ -77,6 +79,7 @@ def extract_models_jar_file():
     stanford_models_dir = os.environ.get('CLASSPATH')
     if not os.path.exists(stanford_models_zip_file_path):
         raise FileNotFoundError(f"Stanford models jar not found at {stanford_models_zip_file_path}")
+    import zipfile
     with zipfile.ZipFile(stanford_models_zip_file_path) as z:
         z.extractall(path=stanford_models_dir)
 
@@ -97,6 +100,60 @@ def download_required_packages():
             # models jar may be inside the zip already extracted; ignore if missing
             pass
 
+# ----------------- stanza pipeline (lazy, process-wide) -----------------
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def stanza_models_present(model_dir: str = STANZA_DIR) -> bool:
+    return (os.path.exists(os.path.join(model_dir, 'resources.json'))
+            and os.path.isdir(os.path.join(model_dir, 'en')))
+
+def get_pipeline():
+    """
+    Return the shared stanza pipeline, building it on first use.
+    Models are only downloaded if they are not already on disk.
+    """
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                import stanza
+                from stanza.pipeline.core import DownloadMethod
+                def build(download_method):
+                    return stanza.Pipeline('en', dir=STANZA_DIR, processors={'tokenize': 'spacy'},
+                                           verbose=False, download_method=download_method)
+                pipeline = None
+                if stanza_models_present(STANZA_DIR):
+                    # no network check when everything is on disk
+                    try:
+                        pipeline = build(None)
+                    except Exception:
+                        pipeline = None
+                if pipeline is None:
+                    _allow_unverified_tls()
+                    pipeline = build(DownloadMethod.REUSE_RESOURCES)
+                _pipeline = pipeline
+    return _pipeline
+
+def warmup() -> Dict:
+    """
+    Load the stanza pipeline and start the Stanford parser ahead of the first request.
+    Returns load timings (seconds) and whether the parser came up.
+    """
+    from isl_parser import ParserUnavailable
+    timings = {}
+    t0 = time.perf_counter()
+    get_pipeline()("warm up")
+    timings["stanza"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    try:
+        get_parser()
+        timings["parser_ready"] = True
+    except ParserUnavailable:
+        timings["parser_ready"] = False
+    timings["parser"] = time.perf_counter() - t0
+    return timings
+
 # ----------------- Core pipeline functions (ported from your script) -----------------
 
 def convert_to_sentence_list(doc):
@@ -127,11 +184,9 @@ def remove_punct(word_list, word_list_detailed):
         for i in range(len(words_detailed)-1, -1, -1):
             if words_detailed[i].upos == 'PUNCT':
                 del words_detailed[i]
-                # remove corresponding token in words (first matching)
-                try:
-                    words.remove(words_detailed[i].text)  # may raise if modified; tolerate
-                except Exception:
-                    pass
+                # words holds the same sentence in the same order: drop the same position
+                if i < len(words):
+                    del words[i]
 
 def filter_words(word_list, word_list_detailed):
     final_words = []
@@ -158,102 +213,305 @@ def lemmatize(final_word_list, word_list_detailed):
                 else:
                     final[i] = getattr(wobj, 'lemma', final[i])
 
-# ---------- Functions that modify parse tree (ported) -----------------
-def label_parse_subtrees(parent_tree):
-    tree_traversal_flag = {}
-    for sub_tree in parent_tree.subtrees():
-        tree_traversal_flag[sub_tree.treeposition()] = 0
-    return tree_traversal_flag
-
-def handle_noun_clause(i, tree_traversal_flag, modified_parse_tree, sub_tree):
-    if tree_traversal_flag[sub_tree.treeposition()] == 0 and tree_traversal_flag[sub_tree.parent().treeposition()] == 0:
-        tree_traversal_flag[sub_tree.treeposition()] = 1
-        modified_parse_tree.insert(i, sub_tree)
-        i = i + 1
-    return i, modified_parse_tree
-
-def handle_verb_prop_clause(i, tree_traversal_flag, modified_parse_tree, sub_tree):
-    for child_sub_tree in sub_tree.subtrees():
-        if child_sub_tree.label() == "NP" or child_sub_tree.label() == 'PRP':
-            if tree_traversal_flag[child_sub_tree.treeposition()] == 0 and tree_traversal_flag[child_sub_tree.parent().treeposition()] == 0:
-                tree_traversal_flag[child_sub_tree.treeposition()] = 1
-                modified_parse_tree.insert(i, child_sub_tree)
-                i = i + 1
-    return i, modified_parse_tree
+# ---------- Functions that modify parse tree (single pass) -----------------
+# Reordering rules (same as the original port):
+#   1. walking the tree top-down, take every NP, and every NP/PRP below a VP or PRP;
+#   2. then take every remaining single-leaf node.
+# A node is skipped if it, an ancestor or a descendant was already taken, so every
+# leaf ends up in exactly one taken node (the original only checked the parent and
+# repeated the words of nested NPs).
+# The sentence is the leaves of the taken nodes, in the order they were taken.
+# Nodes are numbered in preorder with parent ids and subtree ends kept in flat
+# lists, so both rules are one linear scan (no treeposition() / leaves() calls).
+
+def index_parse_tree(tree):
+    """
+    Flatten an nltk Tree into preorder arrays.
+    Returns (nodes, labels, parent, end, leaf_lo, leaf_hi, leaves): node i's subtree
+    is ids i..end[i]-1 and covers leaves[leaf_lo[i]:leaf_hi[i]]; parent[0] is -1.
+    """
+    from nltk.tree import Tree
+    nodes, labels, parent, end, leaf_lo, leaf_hi = [], [], [], [], [], []
+    leaves = []
+    stack = [(tree, -1)]
+    while stack:
+        node, par = stack.pop()
+        if node is None:
+            # closing marker for node id `par`: all of its descendants have been numbered
+            end[par] = len(nodes)
+            leaf_hi[par] = len(leaves)
+            continue
+        if not isinstance(node, Tree):
+            leaves.append(node)
+            continue
+        nid = len(nodes)
+        nodes.append(node)
+        labels.append(node.label())
+        parent.append(par)
+        end.append(0)
+        leaf_lo.append(len(leaves))
+        leaf_hi.append(0)
+        stack.append((None, nid))
+        for child in reversed(node):
+            stack.append((child, nid))
+    return nodes, labels, parent, end, leaf_lo, leaf_hi, leaves
+
+def _reorder_node_ids(labels, parent, end, leaf_lo, leaf_hi) -> List[int]:
+    n = len(labels)
+    covered = bytearray(n)  # inside a taken subtree
+    holds = bytearray(n)    # has a taken node below it
+    order = []
+
+    def take(c):
+        # the root itself is never taken (it is the whole sentence)
+        if c == 0 or covered[c] or holds[c]:
+            return
+        order.append(c)
+        covered[c:end[c]] = b"\x01" * (end[c] - c)
+        p = parent[c]
+        while p >= 0 and not holds[p]:
+            holds[p] = 1
+            p = parent[p]
+
+    # rule 1: NP clauses, and NP/PRP inside verb/pronoun clauses
+    i = 0
+    while i < n:
+        label = labels[i]
+        if label == "NP":
+            take(i)
+        if label == "VP" or label == "PRP":
+            for c in range(i, end[i]):
+                if labels[c] == "NP" or labels[c] == "PRP":
+                    take(c)
+            # everything below was decided by this clause; later visits can't change it
+            i = end[i]
+            continue
+        i += 1
+
+    # rule 2: insert omitted single-leaf clauses
+    for c in range(1, n):
+        if leaf_hi[c] - leaf_lo[c] == 1:
+            take(c)
+    return order
+
+def reorder_tree_order(tree) -> List[int]:
+    """Leaf indices of a parse tree in ISL order (a permutation of range(len(tree.leaves())))."""
+    nodes, labels, parent, end, leaf_lo, leaf_hi, leaves = index_parse_tree(tree)
+    out = []
+    for c in _reorder_node_ids(labels, parent, end, leaf_lo, leaf_hi):
+        out.extend(range(leaf_lo[c], leaf_hi[c]))
+    return out
+
+def reorder_tree_leaves(tree) -> List[str]:
+    """ISL-ordered leaves of a parse tree (any nltk Tree; no ParentedTree needed)."""
+    leaves = tree.leaves()
+    return [leaves[i] for i in reorder_tree_order(tree)]
 
 def modify_tree_structure(parent_tree):
-    tree_traversal_flag = label_parse_subtrees(parent_tree)
-    modified_parse_tree = ParentedTree('ROOT', [])
-    i = 0
-    for sub_tree in parent_tree.subtrees():
-        if sub_tree.label() == "NP":
-            i, modified_parse_tree = handle_noun_clause(i, tree_traversal_flag, modified_parse_tree, sub_tree)
-        if sub_tree.label() == "VP" or sub_tree.label() == "PRP":
-            i, modified_parse_tree = handle_verb_prop_clause(i, tree_traversal_flag, modified_parse_tree, sub_tree)
-
-    # insert omitted single-leaf clauses
-    for sub_tree in parent_tree.subtrees():
-        for child_sub_tree in sub_tree.subtrees():
-            if len(child_sub_tree.leaves()) == 1:
-                if tree_traversal_flag[child_sub_tree.treeposition()] == 0 and tree_traversal_flag[child_sub_tree.parent().treeposition()] == 0:
-                    tree_traversal_flag[child_sub_tree.treeposition()] = 1
-                    modified_parse_tree.insert(i, child_sub_tree)
-                    i = i + 1
-
-    return modified_parse_tree
-
-# ---------------- reorder_eng_to_isl (uses StanfordParser) ------------------
+    """
+    Reordered tree: ROOT with a copy of every taken clause as its children, in order.
+    (Copies, because nltk won't insert a subtree that already has a parent.)
+    """
+    from nltk.tree import ParentedTree
+    nodes, labels, parent, end, leaf_lo, leaf_hi, leaves = index_parse_tree(parent_tree)
+    order = _reorder_node_ids(labels, parent, end, leaf_lo, leaf_hi)
+    return ParentedTree('ROOT', [ParentedTree.convert(nodes[c]) for c in order])
+
+# ---------------- reorder_eng_to_isl (uses resident Stanford parser) ------------------
+_parser_resources_checked = False
+
+def get_parser():
+    """
+    Return the process-wide Stanford parser pool (see isl_parser.py).
+    Resources are downloaded/extracted once; the JVM is started on first use.
+    """
+    global _parser_resources_checked
+    if not _parser_resources_checked:
+        _parser_resources_checked = True
+        try:
+            download_required_packages()
+        except Exception:
+            # if download fails, just continue and attempt parser (it will error if jars missing)
+            pass
+    from isl_parser import get_parser_pool
+    return get_parser_pool(os.environ.get('STANFORD_PARSER'), os.environ.get('STANFORD_MODELS'))
+
+# per-sentence memo of parse + reorder results (the ISL order as word indices), keyed on the token tuple
+reorder_cache = LRUCache(max_entries=int(os.environ.get('ISL_REORDER_CACHE_ENTRIES', '8192')),
+                         max_bytes=int(os.environ.get('ISL_REORDER_CACHE_BYTES', str(16 * 1024 * 1024))))
+
+def _sentence_key(words: List[str]) -> str:
+    return "\x1f".join(words)
+
+def apply_orders(sentences: list, orders: List[List[int]]) -> list:
+    """Each sentence's items (words, or stanza Word objects) rearranged by its order."""
+    return [[items[i] for i in order] for items, order in zip(sentences, orders)]
+
+def reorder_indices_batch(sentences: List[List[str]], stats: Dict = None) -> List[List[int]]:
+    """
+    sentences: list of token lists (every sentence of one or more documents)
+    Sends all sentences to the parser in one batched call and fans the trees
+    back out to the tree reordering in the original order. Returns, per
+    sentence, its word indices in ISL order; sentences that can't be parsed
+    (or whose parse doesn't line up with the tokens) keep their original order.
+    Sentences seen before (in this batch or earlier ones) come from reorder_cache;
+    if `stats` is given, per-call hit/miss counts are written into it.
+    """
+    results = [list(range(len(words))) for words in sentences]
+    hits = misses = 0
+    # if all words are single letters then skip parsing
+    pending = {}  # sentence key -> indices still needing a parse
+    for i, words in enumerate(sentences):
+        if all(len(w) == 1 for w in words):
+            continue
+        key = _sentence_key(words)
+        if key in pending:
+            pending[key].append(i)
+            hits += 1
+            continue
+        cached = reorder_cache.get(key)
+        if cached is not None:
+            results[i] = list(cached)
+            hits += 1
+        else:
+            pending[key] = [i]
+            misses += 1
+    if stats is not None:
+        stats.update(hits=hits, misses=misses)
+    if not pending:
+        return results
+
+    from nltk.tree import Tree
+    from isl_parser import ParserUnavailable
+
+    keys = list(pending)
+    # parse with the resident StanfordParser server (one JVM per process, not per sentence)
+    try:
+        tree_strs = get_parser().parse_sents([sentences[pending[k][0]] for k in keys])
+    except (ParserUnavailable, OSError):
+        # parser unavailable (common causes: Java missing or wrong CLASSPATH)
+        # fallback to original order
+        return results
+
+    for key, tree_str in zip(keys, tree_strs):
+        if not tree_str:
+            continue
+        try:
+            parse_tree = Tree.fromstring(tree_str)
+        except ValueError:
+            continue
+        order = reorder_tree_order(parse_tree)
+        # the parser re-tokenizes; an order that isn't a permutation of our tokens can't be applied
+        if sorted(order) != results[pending[key][0]]:
+            continue
+        # only successful parses are memoized, so a parser outage isn't cached
+        reorder_cache.put(key, order)
+        for i in pending[key]:
+            results[i] = list(order)
+    return results
+
+def reorder_eng_to_isl_batch(sentences: List[List[str]], stats: Dict = None) -> List[List[str]]:
+    """reorder_indices_batch, returning the reordered words instead of their indices."""
+    return apply_orders(sentences, reorder_indices_batch(sentences, stats))
+
 def reorder_eng_to_isl(word_list: List[str]) -> List[str]:
     """
     word_list: list of tokens for one sentence (strings)
     returns reordered list (based on parse) or original if parser unavailable/errors
     """
-    # ensure stanford parser resources available (downloads/extracts if needed)
-    try:
-        download_required_packages()
-    except Exception:
-        # if download fails, just continue and attempt parser (it will error if jars missing)
-        pass
+    return reorder_eng_to_isl_batch([word_list])[0]
+
+# ---------------- rule-based reorder (in-process, no JVM) ----------------
+# SOV bucketing over stanza's dependency parse, following the spaCy rules in
+# isl_speech/gloss_engine.py:
+#   time -> subject -> adjectives -> object -> verb -> negation -> question
+QUESTION_TAGS = {"WDT", "WP", "WP$", "WRB"}
+NEGATION_LEMMAS = {"not", "never", "no", "n't"}
+# modifiers that stay with their head word instead of being bucketed on their own
+ATTACHED_DEPRELS = {"det", "amod", "compound", "nummod", "case", "nmod:poss", "flat", "fixed"}
+(TIME, SUBJECT, ADJECTIVE, OBJECT, VERB, NEGATION, QUESTION, PUNCT) = range(8)
+
+def _rule_bucket(w) -> int:
+    dep = w.deprel or ""
+    lemma = (w.lemma or w.text).lower()
+    if w.upos == "PUNCT":
+        return PUNCT
+    if lemma in NEGATION_LEMMAS or "Polarity=Neg" in (w.feats or ""):
+        return NEGATION
+    if w.xpos in QUESTION_TAGS:
+        return QUESTION
+    if "subj" in dep:
+        return SUBJECT
+    if dep.endswith("tmod") or w.upos == "ADV":
+        return TIME
+    if "obj" in dep or dep.startswith("obl") or dep.startswith("nmod"):
+        return OBJECT
+    if w.upos in ("VERB", "AUX"):
+        return VERB
+    if w.upos == "ADJ":
+        return ADJECTIVE
+    return OBJECT
+
+def reorder_indices_by_rules(words_detailed) -> List[int]:
+    """
+    words_detailed: stanza Word objects of one sentence (needs the depparse processor)
+    returns the word indices in ISL order, or the original order if there is no parse
+    """
+    if not words_detailed or getattr(words_detailed[0], 'deprel', None) is None:
+        return list(range(len(words_detailed)))
+
+    by_id = {w.id: w for w in words_detailed}
+    buckets = {}
+
+    def bucket_of(w, depth=0):
+        if w.id in buckets:
+            return buckets[w.id]
+        head = by_id.get(w.head)
+        if w.deprel in ATTACHED_DEPRELS and head is not None and depth < len(words_detailed):
+            b = bucket_of(head, depth + 1)
+        else:
+            b = _rule_bucket(w)
+        buckets[w.id] = b
+        return b
 
-    # if all words are single letters then skip parsing
-    if all(len(w) == 1 for w in word_list):
-        return word_list
+    # stable sort: words keep their sentence order inside each bucket
+    return sorted(range(len(words_detailed)), key=lambda i: bucket_of(words_detailed[i]))
 
-    # attempt parsing with StanfordParser (NLTK wrapper)
-    try:
-        parser = StanfordParser(path_to_jar=os.environ.get('STANFORD_PARSER'),
-                                model_path=os.environ.get('STANFORD_MODELS'))
-        # parser.parse expects a list of tokens or a sentence string; we pass the token list
-        possible_parse_tree_list = [tree for tree in parser.parse(word_list)]
-        if not possible_parse_tree_list:
-            return word_list
-    except Exception as e:
-        # parser initialization failed (common causes: Java missing or wrong CLASSPATH)
-        # fallback to original order
-        # print("StanfordParser init/parse failed:", e)
-        return word_list
+def reorder_by_rules(words_detailed) -> List[str]:
+    """reorder_indices_by_rules, returning the word texts instead of their indices."""
+    return [words_detailed[i].text for i in reorder_indices_by_rules(words_detailed)]
 
-    parse_tree = possible_parse_tree_list[0]
-    parent_tree = ParentedTree.convert(parse_tree)
-    modified_parse_tree = modify_tree_structure(parent_tree)
-    parsed_sent = modified_parse_tree.leaves()
-    return parsed_sent
+# reorder backends selectable per call: "stanford" (resident parser), "rules" (dependency rules), "none"
+REORDER_BACKENDS = ("stanford", "rules", "none")
+DEFAULT_REORDER = os.environ.get('ISL_REORDER', 'stanford').strip().lower()
+if DEFAULT_REORDER not in REORDER_BACKENDS:
+    # a typo in the env must not take down every importer (streamlit_app, isl_api, workers)
+    print(f"ISL_REORDER={DEFAULT_REORDER!r} is not one of {REORDER_BACKENDS}; using 'stanford'", file=sys.stderr)
+    DEFAULT_REORDER = 'stanford'
 
 # ---------------- final_output: map words -> words.txt or letters ----------------
 def final_output(word_sequence: List[str], words_txt_path: str) -> List[str]:
     """
     For each word in sequence, if the exact word exists in words.txt -> keep it,
     otherwise fall back to letters (each letter as separate token).
+    Multi-word glosses in words.txt (e.g. "help-me", "1month") are matched first,
+    longest match wins, so they are signed once instead of finger-spelled.
     """
-    # load valid words (lowercase)
-    if not os.path.exists(words_txt_path):
-        raise FileNotFoundError(f"words.txt not found at: {words_txt_path}")
-    with open(words_txt_path, 'r', encoding='utf-8') as f:
-        valid_words = [ln.strip().lower() for ln in f if ln.strip()]
-    valid_set = set([w.replace(" ", "_") for w in valid_words])
+    # shared, cached vocabulary (re-read only when words.txt changes)
+    vocab = get_vocabulary(words_txt_path)
+    valid_set = vocab.words
+    phrases = vocab.phrases
 
     fin_words = []
-    for word in word_sequence:
+    i = 0
+    while i < len(word_sequence):
+        match = phrases.longest(word_sequence, i)
+        if match is not None:
+            fin_words.append(match[0])
+            i = match[1]
+            continue
+        word = word_sequence[i]
+        i += 1
         w = word.lower()
         w_norm = w.replace(" ", "_")
         if w_norm in valid_set:
@@ -266,46 +524,30 @@ def final_output(word_sequence: List[str], words_txt_path: str) -> List[str]:
                 fin_words.append(ch.lower())
     return fin_words
 
-# ---------------- top-level function: text_to_isl ----------------
-def text_to_isl(text: str, words_txt_path: str) -> Tuple[List[str], List[str], Dict]:
-    """
-    Convert input text -> list of final tokens and filenames.
-    Returns (tokens, filenames, meta)
-    meta includes parser_used flag and any errors.
-    """
-    meta = {"parser_used": False, "parser_error": None}
+# ---------------- top-level functions: text_to_isl / texts_to_isl ----------------
+def sanitize_text(text: str) -> str:
+    return text.strip().replace("\n", " ").replace("\t", " ").strip()
 
-    # sanitize input
-    txt = text.strip().replace("\n", " ").replace("\t", " ").strip()
-    if not txt:
-        return [], [], meta
+def tokenize_docs(txts: List[str]) -> list:
+    """Run stanza over one or more texts; several texts go through the pipeline as one batch."""
+    if len(txts) == 1:
+        return [get_pipeline()(txts[0])]
+    import stanza
+    return get_pipeline().bulk_process([stanza.Document([], text=t) for t in txts])
 
-    # run stanza tokenizer
-    doc = en_nlp(txt)
-    sent_list, sent_list_detailed = convert_to_sentence_list(doc)
-    word_list, word_list_detailed = convert_to_word_list(sent_list_detailed)
-
-    # reorder each sentence with parser
-    reordered_sentences = []
-    for words in word_list:
-        try:
-            reordered = reorder_eng_to_isl(words)
-            reordered_sentences.append(reordered)
-            meta["parser_used"] = True
-        except Exception as e:
-            meta["parser_used"] = False
-            meta["parser_error"] = str(e)
-            reordered_sentences.append(words)
+def _finish_doc(word_list, word_list_detailed, orders, words_txt_path: str) -> Tuple[List[str], List[str]]:
+    # put the words and their stanza annotations in ISL order together, so the
+    # punctuation / stop word removal and the lemmas below stay position-aligned
+    word_list = apply_orders(word_list, orders)
+    word_list_detailed = apply_orders(word_list_detailed, orders)
 
     # preprocess: remove punctuation & filter stopwords & lemmatize (as per your script)
-    # run remove_punct in place (it expects lists)
-    # but our remove_punct expects both lists; we already have word_list and word_list_detailed
     try:
         remove_punct(word_list, word_list_detailed)
     except Exception:
         pass
 
-    final_words = filter_words(reordered_sentences, word_list_detailed)
+    final_words = filter_words(word_list, word_list_detailed)
     # lemmatize final_words using word_list_detailed
     try:
         lemmatize(final_words, word_list_detailed)
@@ -321,8 +563,73 @@ def text_to_isl(text: str, words_txt_path: str) -> Tuple[List[str], List[str], D
     # flatten sequences if multiple sentences
     flat_tokens = [tok for sent in final_tokens for tok in sent]
     filenames = [t + ".sigml" if len(t) > 1 else t.upper() + ".sigml" for t in flat_tokens]  # letters uppercase for sigml naming
-    meta["sentences"] = len(reordered_sentences)
-    return flat_tokens, filenames, meta
+    return flat_tokens, filenames
+
+def texts_to_isl(texts: List[str], words_txt_path: str, reorder: str = None) -> List[Tuple[List[str], List[str], Dict]]:
+    """
+    Batched text_to_isl: one stanza pass over all texts and one parser batch over
+    all of their sentences. Returns one (tokens, filenames, meta) per input, in order.
+    reorder picks the word-order backend (see REORDER_BACKENDS; default ISL_REORDER).
+    """
+    reorder = reorder or DEFAULT_REORDER
+    if reorder not in REORDER_BACKENDS:
+        raise ValueError(f"unknown reorder backend {reorder!r}, expected one of {REORDER_BACKENDS}")
+    results = [([], [], {"parser_used": False, "parser_error": None, "reorder": reorder}) for _ in texts]
+
+    # sanitize input
+    txts = [sanitize_text(t) for t in texts]
+    todo = [i for i, t in enumerate(txts) if t]
+    if not todo:
+        return results
+
+    # run stanza tokenizer
+    docs = tokenize_docs([txts[i] for i in todo])
+    per_doc = []
+    all_sentences = []
+    all_detailed = []
+    for doc in docs:
+        sent_list, sent_list_detailed = convert_to_sentence_list(doc)
+        word_list, word_list_detailed = convert_to_word_list(sent_list_detailed)
+        per_doc.append((word_list, word_list_detailed))
+        all_sentences.extend(word_list)
+        all_detailed.extend(word_list_detailed)
+
+    batch_meta = {"parser_used": False, "parser_error": None, "reorder": reorder}
+    if reorder == "rules":
+        orders_all = [reorder_indices_by_rules(words) for words in all_detailed]
+    elif reorder == "none":
+        orders_all = [list(range(len(words))) for words in all_sentences]
+    else:
+        # reorder all sentences of all documents with one batched parser call
+        try:
+            cache_stats = {}
+            orders_all = reorder_indices_batch(all_sentences, stats=cache_stats)
+            batch_meta["parser_used"] = True
+            totals = reorder_cache.stats()
+            batch_meta["reorder_cache"] = dict(cache_stats, entries=totals["entries"], hit_rate=totals["hit_rate"])
+        except Exception as e:
+            batch_meta["parser_used"] = False
+            batch_meta["parser_error"] = str(e)
+            orders_all = [list(range(len(words))) for words in all_sentences]
+
+    # fan the sentence orders back out to their documents
+    offset = 0
+    for i, (word_list, word_list_detailed) in zip(todo, per_doc):
+        orders = orders_all[offset:offset + len(word_list)]
+        offset += len(word_list)
+        flat_tokens, filenames = _finish_doc(word_list, word_list_detailed, orders, words_txt_path)
+        meta = dict(batch_meta, sentences=len(orders))
+        results[i] = (flat_tokens, filenames, meta)
+    return results
+
+def text_to_isl(text: str, words_txt_path: str, reorder: str = None) -> Tuple[List[str], List[str], Dict]:
+    """
+    Convert input text -> list of final tokens and filenames.
+    Returns (tokens, filenames, meta)
+    meta includes parser_used flag and any errors.
+    reorder: "stanford" (default), "rules" (no JVM) or "none".
+    """
+    return texts_to_isl([text], words_txt_path, reorder=reorder)[0]
 
 # ---------------- CLI test ----------------
 if __name__ == "__main__":
@@ -330,9 +637,11 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="ISL Tokenizer (stanford + stanza pipeline)")
     parser.add_argument("--words", "-w", required=True, help="path to words.txt (one token per line)")
     parser.add_argument("--text", "-t", required=True, help="input english text (quoted)")
+    parser.add_argument("--reorder", "-r", choices=REORDER_BACKENDS, default=DEFAULT_REORDER,
+                        help="word-order backend")
     args = parser.parse_args()
 
-    tokens, files, meta = text_to_isl(args.text, args.words)
+    tokens, files, meta = text_to_isl(args.text, args.words, reorder=args.reorder)
     print("Input:", args.text)
     print("Tokens:", tokens)
     print("Filenames:", files)
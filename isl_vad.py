@@ -0,0 +1,234 @@
+# isl_vad.py
+"""
+Voice activity detection in front of Whisper.
+
+A VAD backend classifies fixed-size frames of 16 kHz float32 audio as speech
+or not. Segmenter turns that frame stream into utterances: it opens on a run
+of speech (plus a little pre-roll), closes after HANGOVER_MS of silence and
+drops everything in between, so Whisper only ever sees speech.
+
+Backends (ISL_VAD):
+  energy - frame energy over an adaptive noise floor + speech-band / spectral
+           flatness check; NumPy only (default)
+  webrtc - py-webrtcvad (pip install webrtcvad)
+  silero - Silero VAD on CPU (pip install silero-vad)
+"""
+import os
+import queue
+import threading
+from collections import deque
+from typing import Callable, Iterator, List
+
+import numpy as np
+
+from isl_audio import WHISPER_RATE, pcm16_to_float32
+
+DEFAULT_VAD = os.environ.get("ISL_VAD", "energy")
+HANGOVER_MS = int(os.environ.get("ISL_VAD_HANGOVER_MS", "300"))
+PREROLL_MS = int(os.environ.get("ISL_VAD_PREROLL_MS", "200"))
+START_MS = int(os.environ.get("ISL_VAD_START_MS", "90"))
+MAX_UTTERANCE_S = float(os.environ.get("ISL_VAD_MAX_UTTERANCE_S", "15"))
+
+
+# ---------------- backends ----------------
+class EnergyVAD:
+    """Energy over an adaptive noise floor, gated by speech-band energy and spectral flatness."""
+    frame_samples = 480  # 30 ms
+
+    def __init__(self, margin_db: float = 10.0, min_db: float = -55.0,
+                 band_ratio: float = 0.6, max_flatness: float = 0.5, rate: int = WHISPER_RATE):
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.band_ratio = band_ratio
+        self.max_flatness = max_flatness
+        self.noise_db = None
+        freqs = np.fft.rfftfreq(self.frame_samples, 1.0 / rate)
+        self._band = (freqs >= 80) & (freqs <= 4000)
+        self._window = np.hanning(self.frame_samples).astype(np.float32)
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        energy_db = 10.0 * np.log10(float(np.mean(frame * frame)) + 1e-10)
+        if self.noise_db is None:
+            self.noise_db = energy_db
+        loud = energy_db > max(self.noise_db + self.margin_db, self.min_db)
+        speech = False
+        if loud:
+            power = np.abs(np.fft.rfft(frame * self._window)) ** 2 + 1e-12
+            in_band = power[self._band].sum() / power.sum()
+            flatness = np.exp(np.mean(np.log(power))) / np.mean(power)
+            speech = in_band >= self.band_ratio and flatness <= self.max_flatness
+        if not speech:
+            # track the noise floor: fall fast, rise slowly
+            if energy_db < self.noise_db:
+                self.noise_db = energy_db
+            else:
+                self.noise_db += 0.05 * (energy_db - self.noise_db)
+        return speech
+
+
+class WebRTCVAD:
+    frame_samples = 480  # webrtcvad accepts 10/20/30 ms frames
+
+    def __init__(self, aggressiveness: int = 2, rate: int = WHISPER_RATE):
+        import webrtcvad
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.rate = rate
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        pcm = (np.clip(frame, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        return self.vad.is_speech(pcm, self.rate)
+
+
+class SileroVAD:
+    frame_samples = 512  # what the 16 kHz Silero model expects
+
+    def __init__(self, threshold: float = 0.5, rate: int = WHISPER_RATE):
+        import torch
+        from silero_vad import load_silero_vad
+        torch.set_num_threads(1)
+        self.torch = torch
+        self.model = load_silero_vad()
+        self.threshold = threshold
+        self.rate = rate
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        return self.model(self.torch.from_numpy(frame), self.rate).item() >= self.threshold
+
+
+VAD_BACKENDS = {"energy": EnergyVAD, "webrtc": WebRTCVAD, "silero": SileroVAD}
+
+
+def get_vad(name: str = None):
+    """New VAD instance for `name` (default ISL_VAD). Backends keep per-stream state."""
+    name = name or DEFAULT_VAD
+    if name not in VAD_BACKENDS:
+        raise ValueError(f"unknown VAD {name!r} (expected one of {sorted(VAD_BACKENDS)})")
+    return VAD_BACKENDS[name]()
+
+
+# ---------------- segmentation ----------------
+class Segmenter:
+    """
+    Frame-level VAD -> utterances. feed() takes any number of samples and
+    returns the utterances (float32 arrays) completed by them.
+
+    `position` is the absolute sample index consumed so far and `speech_end`
+    the index just after the last speech frame, so a streaming consumer can
+    ask "has anyone spoken since X" without keeping the audio (collect=False).
+    """
+
+    def __init__(self, vad=None, rate: int = WHISPER_RATE, hangover_ms: int = HANGOVER_MS,
+                 preroll_ms: int = PREROLL_MS, start_ms: int = START_MS,
+                 max_utterance_s: float = MAX_UTTERANCE_S, collect: bool = True):
+        self.vad = vad if vad is not None else get_vad()
+        self.frame = self.vad.frame_samples
+        frame_ms = self.frame * 1000.0 / rate
+        self.hangover = max(1, int(round(hangover_ms / frame_ms)))
+        self.start = max(1, int(round(start_ms / frame_ms)))
+        self.max_frames = int(max_utterance_s * rate / self.frame)
+        self.collect = collect
+        self._preroll = deque(maxlen=max(self.start, int(round(preroll_ms / frame_ms))))
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._frames: List[np.ndarray] = []
+        self._silent = 0
+        self.triggered = False
+        self.position = 0
+        self.speech_end = 0
+        self.frames_total = 0
+        self.frames_speech = 0
+        self.utterances = 0
+
+    def feed(self, samples: np.ndarray) -> List[np.ndarray]:
+        done = []
+        data = np.concatenate((self._pending, samples)) if len(self._pending) else samples
+        n = len(data) - len(data) % self.frame
+        for i in range(0, n, self.frame):
+            utterance = self._step(data[i:i + self.frame])
+            if utterance is not None:
+                done.append(utterance)
+        self._pending = data[n:].copy()
+        return done
+
+    def _step(self, frame: np.ndarray):
+        speech = self.vad.is_speech(frame)
+        self.position += self.frame
+        self.frames_total += 1
+        if speech:
+            self.frames_speech += 1
+            self.speech_end = self.position
+        if not self.triggered:
+            self._preroll.append((frame, speech))
+            # open once START_MS worth of the pre-roll window is speech
+            if sum(s for _, s in self._preroll) >= self.start:
+                self.triggered = True
+                self._silent = 0
+                self._frames = [f for f, _ in self._preroll] if self.collect else []
+                self._preroll.clear()
+            return None
+        if self.collect:
+            self._frames.append(frame)
+        self._silent = 0 if speech else self._silent + 1
+        if self._silent >= self.hangover or len(self._frames) >= self.max_frames > 0:
+            return self._close()
+        return None
+
+    def _close(self):
+        self.triggered = False
+        self.utterances += 1
+        # trailing silence past a short tail is not sent to the recogniser
+        keep = len(self._frames) - max(0, self._silent - 2)
+        frames, self._frames = self._frames[:keep], []
+        self._silent = 0
+        if not self.collect:
+            return None
+        return np.concatenate(frames) if frames else None
+
+    def flush(self):
+        """Close an open utterance at end of stream."""
+        self._pending = np.zeros(0, dtype=np.float32)
+        return self._close() if self.triggered else None
+
+    def stats(self):
+        return {
+            "vad": type(self.vad).__name__,
+            "frames": self.frames_total,
+            "speech_ratio": self.frames_speech / self.frames_total if self.frames_total else 0.0,
+            "utterances": self.utterances,
+        }
+
+
+def trim_silence(samples: np.ndarray, vad=None) -> np.ndarray:
+    """Speech segments of a finished recording, concatenated (empty if none)."""
+    seg = Segmenter(vad, max_utterance_s=0)
+    parts = seg.feed(samples)
+    tail = seg.flush()
+    if tail is not None:
+        parts.append(tail)
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+
+def utterance_stream(read_chunk: Callable[[], bytes], segmenter: Segmenter = None,
+                     maxsize: int = 32) -> Iterator[np.ndarray]:
+    """
+    Yield utterances from a microphone. `read_chunk` returns 16 kHz mono int16
+    bytes (PyAudio stream.read, sr.Microphone's source.stream.read). Capture
+    and VAD run on their own thread, so audio keeps flowing while the caller
+    transcribes.
+    """
+    segmenter = segmenter or Segmenter()
+    utterances: queue.Queue = queue.Queue(maxsize=maxsize)
+
+    def capture():
+        try:
+            while True:
+                for utterance in segmenter.feed(pcm16_to_float32(read_chunk())):
+                    utterances.put(utterance)
+        except Exception as e:
+            utterances.put(e)
+
+    threading.Thread(target=capture, daemon=True).start()
+    while True:
+        item = utterances.get()
+        if isinstance(item, Exception):
+            raise item
+        yield item
@@ -0,0 +1,158 @@
+# isl_vocab.py
+"""
+Cached, indexed view of words.txt.
+
+The vocabulary is read once per process and re-read only when the file's
+mtime changes. Entries are normalized the same way final_output always did
+(lowercase, spaces -> underscores) and kept in a frozen set for O(1)
+membership plus a character trie for prefix queries.
+"""
+import os
+import re
+import time
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# how often (seconds) a cached vocabulary re-stats its file for changes
+CHECK_INTERVAL = float(os.environ.get("ISL_VOCAB_CHECK_INTERVAL", "2"))
+
+# trie node key marking the end of an entry
+_END = "\0"
+
+
+# where compound glosses split into words: separators ("help-me", "resting_position",
+# "help me") and a digit followed by a letter ("1month", "2-3fingerbent")
+_PART_SPLIT = re.compile(r"[-_ ]+|(?<=[0-9])(?=[a-z])")
+
+
+def normalize(word: str) -> str:
+    return word.strip().lower().replace(" ", "_")
+
+
+def gloss_parts(entry: str) -> List[str]:
+    return [p for p in _PART_SPLIT.split(entry.strip().lower()) if p]
+
+
+class PhraseMatcher:
+    """
+    Longest-match finder for multi-word glosses over a token stream.
+
+    Entries of two or more words ("help-me" -> help, me; "1month" -> 1, month)
+    are indexed in a trie keyed by whole words, and matching compares token
+    against word, so ["help", "me"] -> "help-me" and ["1", "month"] -> "1month",
+    while adjacent unrelated words never fuse ("man go" is not "mango", "1 2 3"
+    is not "12 3"). Each start position walks at most the longest entry's word
+    count, so a pass over a sentence is linear in its length.
+    """
+
+    def __init__(self, entries: Iterable[str]):
+        self.trie = {}
+        for entry in sorted(entries):
+            parts = gloss_parts(entry)
+            if len(parts) < 2:
+                continue  # single words are plain vocabulary lookups
+            node = self.trie
+            for part in parts:
+                node = node.setdefault(part, {})
+            # keep the first (sorted) entry if two glosses split into the same words
+            node.setdefault(_END, entry)
+
+    def longest(self, tokens: List[str], start: int) -> Optional[Tuple[str, int]]:
+        """
+        Longest entry spanning two or more tokens from tokens[start:].
+        Returns (entry, end) with end exclusive, or None.
+        """
+        node = self.trie
+        best = None
+        for j in range(start, len(tokens)):
+            node = node.get(tokens[j].strip().lower())
+            if node is None:
+                return best
+            if _END in node:
+                best = (node[_END], j + 1)
+        return best
+
+
+class Vocabulary:
+    def __init__(self, entries: Iterable[str], path: Optional[str] = None, mtime: float = 0.0):
+        self.path = path
+        self.mtime = mtime
+        self.words = frozenset(normalize(w) for w in entries if w.strip())
+        self.version = hashlib.sha1("\n".join(sorted(self.words)).encode("utf-8")).hexdigest()[:12]
+        self.trie = {}
+        for w in self.words:
+            node = self.trie
+            for ch in w:
+                node = node.setdefault(ch, {})
+            node[_END] = w
+        self._checked = time.monotonic()
+        self._phrases = None
+
+    @property
+    def phrases(self) -> PhraseMatcher:
+        """Multi-word matcher over the same entries (built on first use)."""
+        if self._phrases is None:
+            self._phrases = PhraseMatcher(self.words)
+        return self._phrases
+
+    @classmethod
+    def load(cls, path: str) -> "Vocabulary":
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"words.txt not found at: {path}")
+        mtime = os.stat(path).st_mtime
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read().splitlines(), path=path, mtime=mtime)
+
+    def __contains__(self, word: str) -> bool:
+        return normalize(word) in self.words
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def lookup(self, word: str) -> Optional[str]:
+        """Normalized entry for `word`, or None if it isn't in the vocabulary."""
+        w = normalize(word)
+        return w if w in self.words else None
+
+    def has_prefix(self, prefix: str) -> bool:
+        node = self.trie
+        for ch in normalize(prefix):
+            node = node.get(ch)
+            if node is None:
+                return False
+        return True
+
+    def stale(self) -> bool:
+        """True if the backing file changed since load (stat at most every CHECK_INTERVAL s)."""
+        if self.path is None:
+            return False
+        now = time.monotonic()
+        if now - self._checked < CHECK_INTERVAL:
+            return False
+        self._checked = now
+        try:
+            return os.stat(self.path).st_mtime != self.mtime
+        except OSError:
+            return True
+
+
+# ---------------- process-wide cache (one Vocabulary per file) ----------------
+_vocabularies: Dict[str, Vocabulary] = {}
+_vocab_lock = threading.Lock()
+
+
+def get_vocabulary(path: str) -> Vocabulary:
+    """Shared Vocabulary for `path`, loaded once and reloaded when the file changes."""
+    key = os.path.realpath(path)
+    vocab = _vocabularies.get(key)
+    if vocab is not None and not vocab.stale():
+        return vocab
+    with _vocab_lock:
+        current = _vocabularies.get(key)
+        if current is not None and current is not vocab:
+            # another thread reloaded it while we waited
+            return current
+        vocab = Vocabulary.load(path)
+        _vocabularies[key] = vocab
+        return vocab
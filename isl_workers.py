@@ -0,0 +1,173 @@
+# isl_workers.py
+"""
+Execution layer between the async HTTP handlers and the CPU-heavy tokenizer.
+
+Tokenization runs in a bounded process pool whose workers preload stanza and
+the Stanford parser (isl_tokenizer.warmup) once at start-up. The pool enforces
+a concurrency limit, a bounded wait queue (callers over the limit get
+PoolOverloaded -> HTTP 429) and a per-request timeout, so the event loop stays
+responsive while the work runs. A job whose caller timed out keeps running in
+its worker, so it keeps its slot (and counts as pending) until it finishes.
+
+Config (env):
+  ISL_WORKERS          worker processes (0 = run in a thread of this process)
+  ISL_MAX_CONCURRENCY  jobs running at once (default: ISL_WORKERS)
+  ISL_MAX_QUEUE        jobs allowed to wait for a slot before 429
+  ISL_REQUEST_TIMEOUT  seconds per job before 504
+"""
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List
+
+WORKERS = int(os.environ.get("ISL_WORKERS", "2"))
+MAX_CONCURRENCY = int(os.environ.get("ISL_MAX_CONCURRENCY", str(max(1, WORKERS))))
+MAX_QUEUE = int(os.environ.get("ISL_MAX_QUEUE", "64"))
+REQUEST_TIMEOUT = float(os.environ.get("ISL_REQUEST_TIMEOUT", "30"))
+
+
+class PoolOverloaded(RuntimeError):
+    """Raised when the wait queue is full; maps to HTTP 429."""
+
+
+# ---------------- functions that run inside the worker processes ----------------
+def _init_worker(words_file: str):
+    import isl_tokenizer
+    from isl_vocab import get_vocabulary
+    get_vocabulary(words_file)
+    isl_tokenizer.warmup()
+
+
+def _ping() -> bool:
+    return True
+
+
+def translate_chunk(texts: List[str], words_file: str, reorder: str = None) -> list:
+    """
+    texts_to_isl over a chunk. If the whole chunk fails, retry item by item so
+    only the failing ones report an error. Errors come back as strings
+    (exceptions don't always pickle).
+    """
+    from isl_tokenizer import text_to_isl, texts_to_isl
+    try:
+        return texts_to_isl(texts, words_file, reorder=reorder)
+    except Exception:
+        outs = []
+        for t in texts:
+            try:
+                outs.append(text_to_isl(t, words_file, reorder=reorder))
+            except Exception as e:
+                outs.append(f"tokenization failed: {e}")
+        return outs
+
+
+def worker_health() -> Dict:
+    from isl_parser import parser_health
+    return parser_health()
+
+
+# ---------------- pool (lives in the HTTP process) ----------------
+class TokenizerPool:
+    def __init__(self, words_file: str, workers: int = WORKERS, max_concurrency: int = MAX_CONCURRENCY,
+                 max_queue: int = MAX_QUEUE, timeout: float = REQUEST_TIMEOUT):
+        self.words_file = words_file
+        self.workers = workers
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = self._new_executor()
+        self._slots = None
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def _new_executor(self):
+        if self.workers <= 0:
+            return None
+        # spawn: the parent may already hold threads (uvicorn, parser pool) that fork would copy badly
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(self.words_file,))
+
+    async def warmup(self):
+        """Start the worker processes so models are loaded before the first request."""
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            await loop.run_in_executor(None, _init_worker, self.words_file)
+            return
+        await asyncio.gather(*[loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)])
+
+    async def run(self, fn, *args, timeout: float = None):
+        """Run fn(*args) in the pool; raises PoolOverloaded or asyncio.TimeoutError."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        if self.pending >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise PoolOverloaded(f"{self.pending} requests in flight")
+        self.pending += 1
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            self.pending -= 1
+            raise
+        self.running += 1
+        fut = None
+        executor = self._executor
+        try:
+            loop = asyncio.get_running_loop()
+            fut = loop.run_in_executor(executor, fn, *args)
+            # shielded: a timeout releases the caller but leaves the job (and its slot) alone
+            result = await asyncio.wait_for(asyncio.shield(fut), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except BrokenProcessPool:
+            # a worker died (e.g. OOM); replace the pool so later requests still work.
+            # Every caller of the broken pool lands here: only the first one replaces it,
+            # the others must not shut down the new pool (and cancel its jobs).
+            if self._executor is executor:
+                self.restarts += 1
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+            raise
+        finally:
+            if fut is not None and not fut.done():
+                # the caller gave up (timeout / cancelled) but the job is still running
+                fut.add_done_callback(self._release_when_done)
+            else:
+                self._release()
+        self.completed += 1
+        return result
+
+    def _release(self):
+        self.running -= 1
+        self.pending -= 1
+        self._slots.release()
+
+    def _release_when_done(self, fut):
+        if not fut.cancelled():
+            fut.exception()  # retrieved, so asyncio doesn't log it as never retrieved
+        self._release()
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "timeout": self.timeout,
+            "pending": self.pending,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -2,7 +2,7 @@
 import streamlit as st
 import os
 import json
-from isl_tokenizer import text_to_isl
+from isl_tokenizer import text_to_isl, REORDER_BACKENDS, DEFAULT_REORDER
 
 st.set_page_config(page_title="ISL Tokenizer Demo", layout="centered")
 
@@ -11,6 +11,8 @@ st.markdown("Convert English text → sequence of ISL tokens / sign filenames.\n
 
 # Config
 WORDS_PATH = st.text_input("Path to words.txt", value=os.environ.get("ISL_WORDS_FILE", "words.txt"))
+reorder = st.selectbox("Word-order backend (rules = no Java needed)", REORDER_BACKENDS,
+                       index=REORDER_BACKENDS.index(DEFAULT_REORDER))
 use_api = st.checkbox("Call remote REST API instead of local function", value=False)
 api_url = st.text_input("If using REST API, enter base URL (e.g. http://127.0.0.1:8000)", value="http://127.0.0.1:8000")
 
@@ -26,7 +28,7 @@ with col1:
                 # call REST API
                 try:
                     import requests
-                    resp = requests.post(f"{api_url.rstrip('/')}/to_isl", json={"text": text_input})
+                    resp = requests.post(f"{api_url.rstrip('/')}/to_isl", json={"text": text_input, "reorder": reorder})
                     if resp.status_code != 200:
                         st.error(f"API returned {resp.status_code}: {resp.text}")
                     else:
@@ -39,7 +41,7 @@ with col1:
             else:
                 # call local function directly
                 try:
-                    tokens, filenames, meta = text_to_isl(text_input, WORDS_PATH)
+                    tokens, filenames, meta = text_to_isl(text_input, WORDS_PATH, reorder=reorder)
                     out = {"input": text_input, "tokens": tokens, "filenames": filenames, "meta": meta}
                     st.success("Tokenization (local) completed")
                     st.json(out)
@@ -53,6 +55,7 @@ with col2:
     st.write("- Make sure `words.txt` path is correct (one token per line).")
     st.write("- If you use the remote API option, ensure your FastAPI server has CORS enabled for Streamlit origin.")
     st.write("- For heavy parsing (Stanford parser) ensure Java is installed and stanford jars are present or downloaded.")
+    st.write("- The Stanford parser JVM is started on the first conversion and reused for later ones, so only the first run is slow.")
     st.write("- If you see long startup logs from stanza, those are model-loading messages — wait until finished.")
 
 st.divider()